@@ -322,7 +322,9 @@ class GitRepo:
 
         if force:
             self.clean()
-            self.restore()
+            # A forced checkout already resets the index and work tree: Untracked files only.
+            if not result:
+                self.restore()
 
         return result
 
@@ -1,6 +1,7 @@
 """Hash util functions."""
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 import logging
 import os
@@ -15,6 +16,9 @@ SUBDIR_SRC_TEST = "src/test"
 
 UNKNOWN_COMMIT_ID = ""
 
+# Hash fewer files serially: Not worth the thread pool startup.
+PARALLEL_HASH_MIN_FILES = 8
+
 JAVA_HOMES = (
     "/usr/lib/jvm/java-1.8.0-amazon-corretto.x86_64",  # Container
     "/usr/lib/jvm/java-1.8.0-openjdk-1.8.0.432.b06-1.amzn2.0.1.x86_64",  # Local
@@ -96,15 +100,27 @@ def get_git_commit_ids(repo_obj, num: int = 0, poms=None):
     return tuple(commit_ids)
 
 
+def _hash_file(file: str) -> Tuple[str, int]:
+    """Hash a file, with its number of lines."""
+    return (
+        get_hash(utils.load_file(file, mode="rb"), encode=False),
+        len((utils.load_file(file, fix=utils.FIX_UTF8) or "").splitlines()),
+    )
+
+
 def _hash_files(files) -> Tuple[str, int]:
-    """Hash files."""
-    hashes = []
-    loc = 0
-    for file in files:
-        hashes.append(get_hash(utils.load_file(file, mode="rb"), encode=False))
-        loc += len((utils.load_file(file, fix=utils.FIX_UTF8) or "").splitlines())
+    """Hash files, in the same order."""
+    max_workers = utils.get_max_workers()
+    if len(files) < PARALLEL_HASH_MIN_FILES or max_workers == 1:
+        results = tuple(map(_hash_file, files))
+    else:
+        # File reads and hashing release the GIL.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = tuple(executor.map(_hash_file, files))
 
-    return "\n".join(hashes), loc
+    return "\n".join([result[0] for result in results]), sum(
+        result[1] for result in results
+    )
 
 
 def get_repo_hash(
@@ -127,8 +143,13 @@ def get_repo_hash(
         if hash_tree:
             inputs.append(utils.run_command(["tree ."], cwd=root_dir)[0])
 
+        # Walk the tree once for both.
+        if hash_source or hash_pom:
+            src_files, pom_files = utils.find_files_by_names(
+                root_dir, (r"\*.java", POM)
+            )
+
         if hash_source:
-            src_files = utils.find_files(root_dir, r"\*.java")
             logging.info("# java files: %d.", len(src_files))
 
             # Hashes only, without filenames
@@ -160,7 +181,6 @@ def get_repo_hash(
 
         if hash_pom:
             # Hashes with filenames
-            pom_files = utils.find_files(root_dir, POM)
             logging.info("# %s files: %d.", POM, len(pom_files))
             for pom in pom_files:
                 pom_rel = os.path.relpath(pom, root_dir)
@@ -138,6 +138,27 @@ class TestGitRepo(unittest.TestCase):
             self.repo.run_metrics(**KWARGS_METRICS)
             self.assertEqual(self.repo.metrics, METRICS_CLEAN)
 
+    @parameterized.expand(
+        (
+            (MASTER,),
+            (BRANCH_00,),
+        )
+    )
+    def test_checkout(self, branch):
+        """Test for git checkout: Forced by default."""
+        self.assertTrue(self.repo.new_branch(BRANCH_00, MASTER, checkout=False))
+
+        # Staged, unstaged and untracked changes.
+        utils.export_file(self.file_path, "Staged.\n")
+        utils.export_file(f"{self.file_path}.staged", "Staged.\n")
+        self.repo.add_all()
+        utils.export_file(self.file_path, "Unstaged.\n")
+        utils.export_file(f"{self.file_path}.new", "Untracked.\n")
+
+        self.assertTrue(self.repo.checkout(branch))
+        self.assertIn(GIT_CLEAN, self.repo.status()[0])
+        self.assertEqual(utils.load_file(self.file_path), "Hello,\nWorld.\n")
+
     @parameterized.expand(
         (
             # Dir does not exist.
@@ -8,6 +8,7 @@ from typing import Any, Sequence, Tuple
 import unittest
 
 from parameterized import parameterized
+from self_debug.proto import builder_pb2
 
 from self_debug.common import utils
 
@@ -64,6 +65,12 @@ class TestUtils(unittest.TestCase):
         self.assertIsInstance(output, Exception)
         self.assertFalse(success)
 
+    def test_get_max_workers(self):
+        """Unit tests get_max_workers."""
+        max_workers = utils.get_max_workers()
+        self.assertGreaterEqual(max_workers, 1)
+        self.assertLessEqual(max_workers, max(1, os.cpu_count() or 1))
+
     @parameterized.expand(
         (
             (
@@ -127,6 +134,19 @@ class TestUtils(unittest.TestCase):
                 content += line
                 self.assertEqual(utils.load_file(tmp_file), content)
 
+    def test_parse_proto_cached(self):
+        """Unit test for parse_proto_cached."""
+        text_proto = 'maven_builder { root_dir: "/tmp/project" }'
+
+        proto = utils.parse_proto_cached(text_proto, builder_pb2.Builder)
+        self.assertEqual(proto, utils.parse_proto(text_proto, builder_pb2.Builder))
+
+        # A new copy every time.
+        proto.maven_builder.root_dir = "/tmp/updated"
+        new_proto = utils.parse_proto_cached(text_proto, builder_pb2.Builder)
+        self.assertIsNot(new_proto, proto)
+        self.assertEqual(new_proto.maven_builder.root_dir, "/tmp/project")
+
     def test_rw_json_file(self):
         """Unit test for load_json, export_json."""
         data = {
@@ -201,6 +221,26 @@ class TestUtils(unittest.TestCase):
             self.assertTrue(file.startswith(_PWD))
             self.assertTrue(file.endswith(expected_file), f"{file} vs {expected_file}")
 
+    def test_find_files_by_names(self):
+        """Unit test for find_files_by_names: Same as find_files per name."""
+        names = (r"\*.pbtxt", r"test_\*.py", "*.xproj")
+        self.assertEqual(
+            utils.find_files_by_names(_PWD, names),
+            tuple(utils.find_files(_PWD, name) for name in names),
+        )
+        self.assertEqual(utils.find_files_by_names(_PWD, ()), ())
+
+    def test_find_file_no_such_dir(self):
+        """Unit test for find_files: No such dir."""
+        self.assertEqual(utils.find_files(os.path.join(_PWD, "no-such-dir"), "*"), ())
+
+    def test_find_file_dir(self):
+        """Unit test for find_files: Dirs are matched as well."""
+        self.assertEqual(
+            utils.find_files(_PWD, "testdata"),
+            (os.path.join(_PWD, "testdata"),),
+        )
+
     @parameterized.expand(
         (
             # Plain text.
@@ -383,6 +423,15 @@ class TestUtils(unittest.TestCase):
                 expected_content,
             )
 
+        # Preloaded lines, the file is gone.
+        lines = tuple(utils.NEW_LINE.join(contents).splitlines())
+        self.assertEqual(
+            utils.get_snippet(
+                tmp_file, line_number, before, after, line_function, lines=lines
+            ),
+            expected_content,
+        )
+
     @parameterized.expand(
         (
             # Invalid
@@ -2,18 +2,21 @@
 
 from contextlib import ContextDecorator
 from dataclasses import dataclass
+import fnmatch
+import functools
 import glob
+import itertools
 import json
 import logging
 import os
 import re
 import subprocess
+import sys
 import tempfile
 import time
 from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
 from google.protobuf import text_format
-import requests
 
 
 SKIP_SPARK_PREFIX = "SKIP-SPARK-METRICS-"
@@ -37,6 +40,9 @@ GITHUB_URL = "https://github.com/klee-contrib/kinetix"
 
 _PWD = os.path.dirname(os.path.abspath(__file__))
 
+# Slots are only supported by dataclasses in python 3.10+.
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class CmdData:
@@ -105,6 +111,11 @@ def run_command(*args, **kwargs) -> Tuple[Union[str, Exception], int]:
     return result.error, result.return_code == 0
 
 
+def get_max_workers() -> int:
+    """Workers for a thread pool: All cpus but two, at least one."""
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
 def copy_dir(root_dir: str, **kwargs) -> str:
     """Get a new root dir: cp -r $FROM $TO."""
     root_dir = os.path.abspath(root_dir)
@@ -208,9 +219,21 @@ def parse_proto(text_proto: str, proto_type):
     return text_format.Parse(text_proto, proto_type())
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_proto_cached(text_proto: str, proto_type):
+    return parse_proto(text_proto, proto_type)
+
+
+def parse_proto_cached(text_proto: str, proto_type):
+    """Parse text proto, cached by text: A new copy is returned, which is safe to update."""
+    proto = proto_type()
+    proto.CopyFrom(_parse_proto_cached(text_proto, proto_type))
+    return proto
+
+
 def load_proto(filename: str, proto_type):
     """Load proto from a file."""
-    return parse_proto(load_file(filename), proto_type)
+    return parse_proto_cached(load_file(filename), proto_type)
 
 
 def str_proto(proto: Any):
@@ -224,13 +247,32 @@ def export_proto(proto: Any, filename: str):
 
 
 def find_files(root_dir: str, filename: str) -> Tuple[str]:
-    """Find file by name."""
-    files, success = run_command(f"find {root_dir} -name {filename}")
-    if not success:
-        return ()
+    """Find file by name, as in `find {root_dir} -name {filename}`."""
+    return find_files_by_names(root_dir, (filename,))[0]
+
+
+def find_files_by_names(root_dir: str, filenames: Sequence[str]) -> Tuple[Tuple[str]]:
+    """Find files by names with one single walk: One tuple of files per name."""
+    # Patterns may be escaped for the shell, e.g. `\*.java`.
+    patterns = [filename.replace("\\", "") for filename in filenames]
+
+    files = [[] for _ in patterns]
 
-    files = files.split(NEW_LINE)
-    return tuple(sorted(os.path.abspath(os.path.join(root_dir, f)) for f in files if f))
+    def _match(name: str, path: str):
+        for pattern, pattern_files in zip(patterns, files):
+            if fnmatch.fnmatchcase(name, pattern):
+                pattern_files.append(path)
+
+    if os.path.exists(root_dir):
+        _match(os.path.basename(os.path.normpath(root_dir)), root_dir)
+    for dirpath, dirnames, names in os.walk(root_dir):
+        for name in itertools.chain(dirnames, names):
+            _match(name, os.path.join(dirpath, name))
+
+    return tuple(
+        tuple(sorted(os.path.abspath(f) for f in pattern_files))
+        for pattern_files in files
+    )
 
 
 def normalize_file(filename: Optional[str]) -> bool:
@@ -370,25 +412,28 @@ def get_snippet(
     before: int = 5,
     after: int = 5,
     line_function: Any = None,
+    lines: Optional[Sequence[str]] = None,
 ) -> Tuple[str, str]:
-    """Get code snippet for line."""
+    """Get code snippet for line: From split `lines` if given, or else the file."""
     line_number -= 1  # Index starts from 0 now.
 
     if line_number < 0:
         return "", ""
 
-    content = load_file(filename)
-    lines = content.splitlines()
+    if lines is None:
+        lines = load_file(filename).splitlines()
 
     if line_number >= len(lines):
         return "", ""
 
+    # Copy the snippet only: `lines` may be shared.
     line_copy = lines[line_number]
-    if line_function is not None and len(lines) > line_number:
-        lines[line_number] = line_function(lines[line_number])
-
     start = max(line_number - before, 0)
-    return NEW_LINE.join(lines[start : (line_number + max(after, 0) + 1)]), line_copy
+    snippet = list(lines[start : (line_number + max(after, 0) + 1)])
+    if line_function is not None:
+        snippet[line_number - start] = line_function(line_copy)
+
+    return NEW_LINE.join(snippet), line_copy
 
 
 def is_valid_github_url(url: str, timeout_seconds: int = 30) -> bool:
@@ -397,6 +442,9 @@ def is_valid_github_url(url: str, timeout_seconds: int = 30) -> bool:
     if not url.startswith(prefix) or len(url) <= len(prefix):
         return False
 
+    # Imported lazily: It's slow to import, and only used for Github urls.
+    import requests  # pylint: disable=import-outside-toplevel
+
     try:
         status_code = requests.head(url, timeout=timeout_seconds).status_code
     except Exception as error:
@@ -426,6 +474,8 @@ def get_github_license(
         return None
     user, repo = parts[-2], parts[-1]
 
+    import requests  # pylint: disable=import-outside-toplevel
+
     headers = {"Accept": "application/vnd.github.v3+json"}
     if token:
         headers["Authorization"] = f"token {token}"
@@ -551,14 +601,22 @@ def get_class_names(classes: Sequence[Any]) -> Dict[str, Any]:
 
 
 def create_instance(
-    option: Any, candidate_classes: Sequence[Any], *args, **kwargs
+    option: Any,
+    candidate_classes: Union[Sequence[Any], Dict[str, Any]],
+    *args,
+    **kwargs,
 ) -> Any:
     """Create an instance from candidate classes.
 
     When option is str: To create from class constructor directly, based on its name.
     When option is a config: It's to call class static method `create_from_config`.
+
+    Candidate classes can be precomputed by `get_class_names` as well.
     """
-    class_names = get_class_names(candidate_classes)
+    if isinstance(candidate_classes, dict):
+        class_names = candidate_classes
+    else:
+        class_names = get_class_names(candidate_classes)
 
     if isinstance(option, str):
         config = None
@@ -8,6 +8,7 @@ cd -
 
 find . -name __pycache__ | xargs rm -rf
 find . -name .ruff_cache | xargs rm -rf
+find . -name .pytest_cache | xargs rm -rf
 
 rm -rf ./container/SelfDebug
 
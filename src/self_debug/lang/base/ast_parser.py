@@ -18,9 +18,13 @@ A few level of data:
 """
 
 import abc
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import copy
 from dataclasses import dataclass, field as dataclass_field
+import functools
 import logging
+import operator
 import os
 from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
@@ -32,6 +36,11 @@ from self_debug.metrics import utils as metric_utils
 
 AstData = Union[None, ET.Element]
 
+# Parse fewer files serially: Not worth the thread pool startup.
+PARALLEL_PARSE_MIN_FILES = 8
+# Parsed files kept per parser: The least recently used ones are evicted first.
+MAX_CACHED_FILES = 1024
+
 
 CLASS = "Class"
 LINE_START = "LineStart"
@@ -52,7 +61,58 @@ VARIABLE = "Variable"
 VARIABLES = "Variables"
 
 
-@dataclass
+class LineNumberTreeBuilder(ET.TreeBuilder):
+    """Tree builder converting line numbers to int once while parsing AST XML."""
+
+    def end(self, tag):
+        elem = super().end(tag)
+        if tag in (LINE_START, LINE_END) and elem.text is not None:
+            elem.text = int(elem.text)
+
+        return elem
+
+
+def parse_ast_xml(filename: str) -> ET.Element:
+    """Parse AST XML file with int line numbers."""
+    parser = ET.XMLParser(target=LineNumberTreeBuilder())
+    return ET.parse(filename, parser=parser).getroot()
+
+
+def _file_signature(filename: str) -> Optional[Tuple[int, int]]:
+    """File modification time (ns) and size, or None if it doesn't exist: Not read."""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _LruCache:
+    """Dict like cache evicting the least recently used items beyond `max_size`."""
+
+    def __init__(self, max_size: int = MAX_CACHED_FILES):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def __getitem__(self, key):
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def __setitem__(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+@dataclass(**utils.DATACLASS_SLOTS)
 class LineData:
     """Method data."""
 
@@ -66,10 +126,13 @@ class LineData:
         return f"[{self.line_start}, {self.line_end}]"
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+
         return isinstance(other, self.__class__) and self.line_start == other.line_start
 
 
-@dataclass
+@dataclass(**utils.DATACLASS_SLOTS)
 class _FileLevelData:
     """Data at the file level."""
 
@@ -84,17 +147,21 @@ class _FileLevelData:
         return f"[{self.file_name}]::`{self.signature}`@{self.lines}"
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+
         return (
             isinstance(other, self.__class__)
+            # Cheap line numbers first, then strings.
+            and self.lines == other.lines
             and
             # Skip `name`
             self.signature == other.signature
-            and self.lines == other.lines
             and self.file_name == other.file_name
         )
 
 
-@dataclass
+@dataclass(**utils.DATACLASS_SLOTS)
 class _ClassLevelData(_FileLevelData):
     """Data at the class level."""
 
@@ -104,15 +171,21 @@ class _ClassLevelData(_FileLevelData):
         return f"[{self.file_name}]{self.class_name}::`{self.signature}`@{self.lines}"
 
     def __eq__(self, other) -> bool:
-        return super().__eq__(other) and self.class_name == other.class_name
+        if self is other:
+            return True
 
+        # Not `super()`: It doesn't work for dataclasses with slots before python 3.14.
+        return (
+            _FileLevelData.__eq__(self, other) and self.class_name == other.class_name
+        )
 
-@dataclass
+
+@dataclass(**utils.DATACLASS_SLOTS)
 class VariableData(_ClassLevelData):
     """Variable data: `signature` will be used as `type` instead."""
 
 
-@dataclass
+@dataclass(**utils.DATACLASS_SLOTS)
 class MethodData(VariableData):
     """Method data: Add param list and local vars."""
 
@@ -120,25 +193,24 @@ class MethodData(VariableData):
     local_vars: Tuple[VariableData] = ()
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+
         if (
-            len(self.params) != len(other.params)
+            not isinstance(other, self.__class__)
+            or len(self.params) != len(other.params)
             or len(self.local_vars) != len(other.local_vars)
-            or not super().__eq__(other)
+            or not VariableData.__eq__(self, other)
         ):
             return False
 
-        for lhs, rhs in zip(self.params, other.params):
-            if lhs != rhs:
-                return False
-
-        for lhs, rhs in zip(self.local_vars, other.local_vars):
-            if lhs != rhs:
-                return False
-
-        return True
+        # Either lists or tuples: Compare element-wise without copies.
+        return all(map(operator.eq, self.params, other.params)) and all(
+            map(operator.eq, self.local_vars, other.local_vars)
+        )
 
 
-@dataclass
+@dataclass(**utils.DATACLASS_SLOTS)
 class ClassData(_FileLevelData):
     """Class data."""
 
@@ -148,23 +220,22 @@ class ClassData(_FileLevelData):
     parents: Tuple[_FileLevelData] = ()
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+
         if (
-            len(self.members) != len(other.members)
+            not isinstance(other, self.__class__)
+            or len(self.members) != len(other.members)
             or len(self.methods) != len(other.methods)
             or self.parents != other.parents
-            or not super().__eq__(other)
+            or not _FileLevelData.__eq__(self, other)
         ):
             return False
 
-        for lhs, rhs in zip(self.members, other.members):
-            if lhs != rhs:
-                return False
-
-        for lhs, rhs in zip(self.methods, other.methods):
-            if lhs != rhs:
-                return False
-
-        return True
+        # Either lists or tuples: Compare element-wise without copies.
+        return all(map(operator.eq, self.members, other.members)) and all(
+            map(operator.eq, self.methods, other.methods)
+        )
 
     def __repr__(self):
         return "\n".join(
@@ -198,12 +269,12 @@ class ProjectData:
     tag_counts: defaultdict(int) = dataclass_field(
         default_factory=lambda: defaultdict(int)
     )
-    children: defaultdict(tuple[Any]) = dataclass_field(
-        default_factory=lambda: defaultdict(tuple)
+    children: defaultdict(list[Any]) = dataclass_field(
+        default_factory=lambda: defaultdict(list)
     )
 
 
-@dataclass
+@dataclass(**utils.DATACLASS_SLOTS)
 class PackageData:
     """Package data: Dependencies on those packages, e.g.
 
@@ -279,13 +350,24 @@ class BaseAstParser(abc.ABC):
 
         self.kwargs = kwargs
 
-        self._ast_cache = {}
-        self._metrics = defaultdict(int)
+        self._ast_cache = _LruCache()
+        self._classes_cache = _LruCache()
+        # Latest project file only: (file signature, AST, packages).
+        self._project_cache = (None, None, None)
+        self._metrics = Counter()
+
+        # Reformatted metrics are cached until `_metrics` changes.
+        self._metrics_version = 0
+        self._cached_metrics = None
+        self._cached_metrics_version = None
 
     def reset(self):
         """Reset AST trees."""
-        self._ast_cache = {}
-        self._metrics = {}
+        self._ast_cache = _LruCache()
+        self._classes_cache = _LruCache()
+        self._project_cache = (None, None, None)
+        self._metrics = Counter()
+        self._metrics_version += 1
 
     def dedup_package_data(self, *args, **kwargs) -> Tuple[Tuple[str, Any]]:
         """Dedup package data.
@@ -308,13 +390,14 @@ class BaseAstParser(abc.ABC):
 
     def run_metrics(self):
         """Get metrics."""
-        self._metrics["00-start"] += 1
+        # Collected in one list, then counted in C with a single `Counter.update`.
+        keys = ["00-start"]
 
         if os.path.exists(self.project):
-            self._metrics["01-filter--project-exists"] += 1
+            keys.append("01-filter--project-exists")
         else:
-            self._metrics["01-filter--project-does-not-exist"] += 1
-            self._metrics["02-finish--early"] += 1
+            keys.append("01-filter--project-does-not-exist")
+            keys.append("02-finish--early")
             # return self.metrics
 
         ast = self.parse_project_ast()
@@ -322,62 +405,69 @@ class BaseAstParser(abc.ABC):
         # 1. Project fields.
         project = self.parse_fields_from_project_ast(ast)
         if project is None:
-            self._metrics["02-project--03--project-data=<None>"] += 1
+            keys.append("02-project--03--project-data=<None>")
         else:
-            self._metrics[f"02-project--00--root=<{project.root}>"] += 1
+            keys.append(f"02-project--00--root=<{project.root}>")
             for name, value in project.fields.items():
-                self._metrics[f"02-project--01--00--name=<{name}>"] += 1
-                self._metrics[f"02-project--01--01--value-type={type(value)}"] += 1
+                keys.append(f"02-project--01--00--name=<{name}>")
+                keys.append(f"02-project--01--01--value-type={type(value)}")
                 if isinstance(value, (str, int, float, list, tuple)):
-                    self._metrics[f"02-project--01--02--{name}=<{value}>"] += 1
+                    keys.append(f"02-project--01--02--{name}=<{value}>")
 
-            self._metrics[
+            keys.append(
                 f"02-project--02--00--tag-uniq-count=<{len(project.tag_counts):04d}>"
-            ] += 1
+            )
             for tag, count in project.tag_counts.items():
-                self._metrics[f"02-project--02--01--tag=<{tag}>"] += 1
-                self._metrics[f"02-project--02--02--tag-count=<{tag},{count:02d}>"] += 1
+                keys.append(f"02-project--02--01--tag=<{tag}>")
+                keys.append(f"02-project--02--02--tag-count=<{tag},{count:02d}>")
 
-            self._metrics[
+            keys.append(
                 f"02-project--03--00--children-count=<{len(project.children):04d}>"
-            ] += 1
+            )
             for p_tag, child_elems in project.children.items():
-                self._metrics[
+                keys.append(
                     f"02-project--03--01--child-elem-count=<{len(child_elems):04d}>"
-                ] += 1
+                )
                 for child_elem in child_elems:
                     ch_tag, ch_text = child_elem
                     tag = f"{p_tag}--{ch_tag}"
-                    self._metrics[f"02-project--03--02--child-tag=<{tag}>"] += 1
-                    self._metrics[
+                    keys.append(f"02-project--03--02--child-tag=<{tag}>")
+                    keys.append(
                         f"02-project--03--03--child-tag-value=<{tag},{ch_text}>"
-                    ] += 1
+                    )
 
         # 2. Packages.
         packages = self.parse_packages(ast)
-        self._metrics[f"03-packages-00--len={len(packages):03d}"] += 1
-
-        def _dedup(prefix: str, map_fn: Any) -> int:
-            pkgs = set((map_fn(pkg) for pkg in packages))
-            for name in pkgs:
-                self._metrics[f"{prefix}<{name}>"] += 1
-            return len(pkgs)
+        keys.append(f"03-packages-00--len={len(packages):03d}")
 
+        # Dedup packages for all functions in a single pass.
         named_pkg_fns = self.dedup_package_data()
-        index = 0
-        for name, pkg_fn in named_pkg_fns:
+        pkg_fns = [pkg_fn for _, pkg_fn in named_pkg_fns]
+        uniq_pkgs = [set() for _ in pkg_fns]
+        for pkg in packages:
+            for pkgs, pkg_fn in zip(uniq_pkgs, pkg_fns):
+                pkgs.add(pkg_fn(pkg))
+
+        for index, ((name, _), pkgs) in enumerate(zip(named_pkg_fns, uniq_pkgs)):
             prefix = f"03-packages-01--{index:02d}-package--{name}"
-            count = _dedup(f"{prefix}=", pkg_fn)
-            self._metrics[f"{prefix}--uniq-count=<{count:04d}>"] += 1
-            index += 1
+            for pkg_name in pkgs:
+                keys.append(f"{prefix}=<{pkg_name}>")
+            keys.append(f"{prefix}--uniq-count=<{len(pkgs):04d}>")
 
-        self._metrics["04-finish"] += 1
+        keys.append("04-finish")
+        self._metrics.update(keys)
+        self._metrics_version += 1
         return self.metrics
 
     @property
     def metrics(self):
         """Get metrics."""
-        return metric_utils.reformat_metrics(self, self._metrics)
+        if self._cached_metrics_version != self._metrics_version:
+            self._cached_metrics = metric_utils.reformat_metrics(self, self._metrics)
+            self._cached_metrics_version = self._metrics_version
+
+        # A copy: Reading missing keys from a shared defaultdict would insert them.
+        return defaultdict(int, self._cached_metrics)
 
     def parse_fields_from_project_ast(
         self, ast: AstData, **kwargs
@@ -389,7 +479,7 @@ class BaseAstParser(abc.ABC):
             return None
 
         tag_counts = defaultdict(int)
-        children = defaultdict(tuple)
+        children = defaultdict(list)
         for child in ast:
             tag = child.tag
             tag_counts[tag] += 1
@@ -413,7 +503,7 @@ class BaseAstParser(abc.ABC):
                     )
                 elif hasattr(elem, "text") and elem.text and elem.text.strip():
                     child_elems.append((elem.tag, elem.text))
-            children[tag] += tuple(sorted(child_elems))
+            children[tag].extend(sorted(child_elems))
 
         return ProjectData(
             root=ast.tag, fields=ast.attrib, tag_counts=tag_counts, children=children
@@ -428,17 +518,27 @@ class BaseAstParser(abc.ABC):
         if ast is None and kwargs.get("force_run", True):
             ast = self.parse_project_ast()
 
-        return () if ast is None else self.parse_packages_from_project_ast(ast)
+        if ast is None:
+            return ()
+
+        signature, project_ast, packages = self._project_cache
+        if ast is not project_ast:
+            return self.parse_packages_from_project_ast(ast)
+
+        if packages is None:
+            packages = self.parse_packages_from_project_ast(ast)
+            self._project_cache = (signature, ast, packages)
+        return packages
 
     def _parse_file_level(
         self, ast: AstData = None, typ: Any = VariableData, **kwargs
     ) -> Dict[str, Any]:
+        # Line numbers are already int, see `LineNumberTreeBuilder`.
         line_end = ast.find(LINE_END)
-        kwargs = {
-            "line_start": ast.find(LINE_START).text,
-            "line_end": None if line_end is None else line_end.text,
-        }
-        lines = LineData(**{k: (v if v is None else int(v)) for k, v in kwargs.items()})
+        lines = LineData(
+            line_start=ast.find(LINE_START).text,
+            line_end=None if line_end is None else line_end.text,
+        )
 
         kwargs = {"lines": lines}
         fields = (NAME, SIGNATURE)
@@ -460,23 +560,22 @@ class BaseAstParser(abc.ABC):
 
         return tuple(var)
 
+    def _parse_method(self, method: AstData, **kwargs) -> MethodData:
+        obj = self._parse_file_level(method, typ=MethodData)
+
+        if kwargs.get(PARAMETERS.lower(), True):
+            obj.params = self._parse_vars(method, (PARAMETERS, PARAMETER), **kwargs)
+
+        if kwargs.get(VARIABLES.lower(), True):
+            obj.local_vars = self._parse_vars(method, (VARIABLES, VARIABLE), **kwargs)
+
+        return obj
+
     def _parse_methods(self, cls: AstData = None, **kwargs) -> Tuple[MethodData]:
         result = []
         for methods in cls.findall(METHODS):
             for method in methods.findall(METHOD):
-                obj = self._parse_file_level(method, typ=MethodData)
-
-                if kwargs.get(PARAMETERS.lower(), True):
-                    obj.params = self._parse_vars(
-                        method, (PARAMETERS, PARAMETER), **kwargs
-                    )
-
-                if kwargs.get(VARIABLES.lower(), True):
-                    obj.local_vars = self._parse_vars(
-                        method, (VARIABLES, VARIABLE), **kwargs
-                    )
-
-                result.append(obj)
+                result.append(self._parse_method(method, **kwargs))
         return result
 
     def _parse_parents(self, cls: AstData = None, **kwargs) -> Tuple[VariableData]:
@@ -492,22 +591,64 @@ class BaseAstParser(abc.ABC):
     def parse_classes(
         self, filename: str, ast: AstData = None, **kwargs
     ) -> Tuple[ClassData]:
-        """Parse classes."""
-        ast = self.parse_ast(filename, ast, **kwargs)
+        """Parse classes: Cached by file signature and kwargs, unless `ast` is given."""
+        if ast is not None:
+            return self._parse_classes(ast, **kwargs)
+
+        ast_key = (filename, _file_signature(filename))
+        key = (ast_key, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable kwargs: Not cached.
+            ast = self._parse_ast_by_key(filename, ast_key, **kwargs)
+            return self._parse_classes(ast, **kwargs)
+
+        if key not in self._classes_cache:
+            ast = self._parse_ast_by_key(filename, ast_key, **kwargs)
+            self._classes_cache[key] = self._parse_classes(ast, **kwargs)
+
+        # A copy: Class data is mutable, callers shouldn't change the cached one.
+        return copy.deepcopy(self._classes_cache[key])
+
+    def _parse_classes(self, ast: AstData, **kwargs) -> Tuple[ClassData]:
+        # Class child tag => (field, item tag, item parser, parser kwargs): In one pass.
+        parsers = {
+            PROPERTIES: ("members", PROPERTY, self._parse_file_level, {}),
+            METHODS: ("methods", METHOD, self._parse_method, kwargs),
+            PARENTS: (
+                "parents",
+                PARENT,
+                self._parse_file_level,
+                {"typ": _FileLevelData},
+            ),
+        }
+        parsers = {
+            tag: parser
+            for tag, parser in parsers.items()
+            if kwargs.get(tag.lower(), True)
+        }
 
         classes = []
         for cls in ast.findall(CLASS):
             cls_data = self._parse_file_level(cls, ClassData)
-            if kwargs.get(PROPERTIES.lower(), True):
-                cls_data.members = self._parse_vars(
-                    cls, (PROPERTIES, PROPERTY), **kwargs
-                )
 
-            if kwargs.get(METHODS.lower(), True):
-                cls_data.methods = self._parse_methods(cls, **kwargs)
+            fields = {field: [] for field, _, _, _ in parsers.values()}
+            for child in cls:
+                parser = parsers.get(child.tag)
+                if parser is None:
+                    continue
 
-            if kwargs.get(PARENTS.lower(), True):
-                cls_data.parents = self._parse_parents(cls, **kwargs)
+                field, item_tag, parse, parse_kwargs = parser
+                fields[field].extend(
+                    parse(item, **parse_kwargs) for item in child.findall(item_tag)
+                )
+
+            for field, values in fields.items():
+                # Methods are a list, as in `_parse_methods`.
+                setattr(
+                    cls_data, field, values if field == "methods" else tuple(values)
+                )
 
             classes.append(cls_data)
 
@@ -605,6 +746,14 @@ class BaseAstParser(abc.ABC):
         if self.project is None:
             return None
 
+        # Reparsed only if the project file is edited, e.g. by package upgrades.
+        signature = _file_signature(self.project)
+        if signature is None or signature != self._project_cache[0]:
+            self._project_cache = (signature, self._do_parse_project_ast(), None)
+
+        return self._project_cache[1]
+
+    def _do_parse_project_ast(self) -> AstData:
         try:
             return ET.parse(self.project).getroot()
         except Exception as error:
@@ -617,15 +766,41 @@ class BaseAstParser(abc.ABC):
     def do_parse_ast(self, filename: str, *args, **kwargs) -> AstData:
         """Parse AST for a file."""
 
+    def do_parse_ast_batch(
+        self, filenames: Sequence[str], *args, **kwargs
+    ) -> Tuple[AstData]:
+        """Parse ASTs for files, in the same order."""
+        del args
+
+        # Each file is parsed by a subprocess, so threads suffice to run them in parallel.
+        if len(filenames) < PARALLEL_PARSE_MIN_FILES:
+            return tuple(
+                self.do_parse_ast(filename, **kwargs) for filename in filenames
+            )
+
+        max_workers = utils.get_max_workers()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return tuple(
+                executor.map(functools.partial(self.do_parse_ast, **kwargs), filenames)
+            )
+
     def parse_ast(self, filename: str, ast: AstData = None, **kwargs) -> AstData:
         """Parse AST for a file."""
         if ast is not None:
             return ast
 
-        if filename not in self._ast_cache:
-            self._ast_cache[filename] = self.do_parse_ast(filename, **kwargs)
+        # Keyed by mtime and size as well: Edited files are reparsed, unchanged ones are not.
+        return self._parse_ast_by_key(
+            filename, (filename, _file_signature(filename)), **kwargs
+        )
+
+    def _parse_ast_by_key(
+        self, filename: str, key: Tuple[str, Optional[Tuple[int, int]]], **kwargs
+    ) -> AstData:
+        if key not in self._ast_cache:
+            self._ast_cache[key] = self.do_parse_ast(filename, **kwargs)
 
-        return self._ast_cache[filename]
+        return self._ast_cache[key]
 
     def parse(
         self, filenames: Optional[Sequence[str]] = None, **kwargs
@@ -633,8 +808,22 @@ class BaseAstParser(abc.ABC):
         """Parse ASTs for the project and file(s)."""
         project_ast = self.parse_project_ast()
 
-        ast = {}
-        for filename in filenames:
-            ast[filename] = self.parse_ast(filename, **kwargs)
+        keys = {
+            filename: (filename, _file_signature(filename))
+            for filename in filenames or ()
+        }
+        # Cache hits first: Caching the missing ones may evict them.
+        asts = {
+            filename: self._ast_cache[key]
+            for filename, key in keys.items()
+            if key in self._ast_cache
+        }
+        missing = [filename for filename in keys if filename not in asts]
+
+        if missing:
+            parsed = self.do_parse_ast_batch(missing, **kwargs)
+            for filename, ast in zip(missing, parsed):
+                self._ast_cache[keys[filename]] = ast
+                asts[filename] = ast
 
-        return project_ast, ast
+        return project_ast, {filename: asts[filename] for filename in keys}
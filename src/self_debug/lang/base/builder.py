@@ -1,10 +1,14 @@
 """Base builder and structured build data as output."""
 
 import abc
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field as dataclass_field
+import functools
+import itertools
 import logging
+import operator
 import os
+import sys
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from self_debug.proto import builder_pb2
@@ -23,6 +27,10 @@ BUILD_COMMAND_SANITY_CHECK = "build_command_sanity_check"
 
 BUILD_ERROR_CHANGE_OPTIONS = "build_error_change_option"
 
+METRICS_ENABLED = "metrics_enabled"
+
+ERRORS_TO_STR_PREFIX = "{index}/{count}: "
+
 #
 # Build errors comparison.
 #
@@ -55,10 +63,53 @@ BUILD_ERRORS_NON_DECREASING_AS_FEEDBACK = (
 
 ENABLE_FEEDBACK = utils.ENABLE_FEEDBACK
 
-
-@dataclass
+#
+# Metric keys: `(tag, *fields)` tuples, which are formatted lazily.
+#
+METRIC_BUILD_ERRORS_LEN = "02-build-errors--len"
+METRIC_BUILD_ERRORS_LEN_DIR = "02-build-errors--01--len-dir"
+METRIC_ERROR_CODE = "03-00-build-error--code"
+METRIC_ERROR_LINES = "03-01-build-error--lines"
+METRIC_ERROR_LINES_FILE = "03-02-build-error--lines--file"
+METRIC_ERROR_LINE = "04-build-error--line"
+METRIC_ERROR_FILE = "05-00-build-error--file"
+METRIC_ERROR_FILE_SUFFIX = "05-01-build-error--file-suffix"
+METRIC_ERROR_FILE_SUFFIX_CODE = "05-02-build-error--file-suffix-code"
+METRIC_ERROR_CODE_COUNT = "05-03-build-error-code-count"
+METRIC_ERROR_COUNT = "05-04-build-error-count"
+
+METRIC_KEY_FORMATS = {
+    METRIC_BUILD_ERRORS_LEN: "02-build-errors--len={0:03d}",
+    METRIC_BUILD_ERRORS_LEN_DIR: "02-build-errors--01--len-dir=<{0:03d},{1}>",
+    METRIC_ERROR_CODE: "03-00-build-error--code=<{0}>",
+    METRIC_ERROR_LINES: "03-01-build-error--lines={0:03d}",
+    METRIC_ERROR_LINES_FILE: "03-02-build-error--lines={0:03d}--file=<{1}>",
+    METRIC_ERROR_LINE: "04-{0:02d}-build-error--line{0:02d}=[{1}]<<<{2}>>>",
+    METRIC_ERROR_FILE: "05-00-build-error--file=<{0}>",
+    METRIC_ERROR_FILE_SUFFIX: "05-01-build-error--file-suffix=<{0}>",
+    METRIC_ERROR_FILE_SUFFIX_CODE: "05-02-build-error--file-suffix-code=<{0},{1}>",
+    METRIC_ERROR_CODE_COUNT: "05-03-build-error-code-count--~{0:03d}~<##{1:03d}##{2}>",
+    METRIC_ERROR_COUNT: "05-04-build-error-count--~{0:03d}~<##{1:03d}##[{2}]{3}>",
+}
+
+
+def format_metrics(metrics: Dict[Union[str, Tuple[Any]], int]) -> Dict[str, int]:
+    """Format metric keys: Tuple keys are formatted with `METRIC_KEY_FORMATS`."""
+    result = defaultdict(int)
+    for key, count in metrics.items():
+        if isinstance(key, tuple):
+            key = METRIC_KEY_FORMATS[key[0]].format(*key[1:])
+        result[key] += count
+
+    return result
+
+
+DATACLASS_SLOTS = utils.DATACLASS_SLOTS
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class BuildData:
-    """Build error data."""
+    """Build error data: Frozen, as its keys and hash are computed once."""
 
     filename: str
     line_number: int
@@ -76,49 +127,122 @@ class BuildData:
     related_files: Optional[List[str]] = None
     context: Optional[str] = None
 
-    def __repr__(self):
-        return (
-            f"{self.filename}@({self.line_number}, {self.column_number}): "
-            f"[{self.error_code}] {self.error_message}."
+    # Cached `__repr__`, `str_wo_line_column` and `__hash__`.
+    _repr: Optional[str] = dataclass_field(default=None, init=False, repr=False)
+    _str_wo_line_column: Optional[str] = dataclass_field(
+        default=None, init=False, repr=False
+    )
+    _hash: Optional[int] = dataclass_field(default=None, init=False, repr=False)
+    # Fields compared in `__eq__` and `equal_wo_line_column`, as tuples.
+    _key: Tuple[Any, ...] = dataclass_field(default=(), init=False, repr=False)
+    _key_wo_line_column: Tuple[Any, ...] = dataclass_field(
+        default=(), init=False, repr=False
+    )
+
+    def __post_init__(self):
+        # Intern repeated strings, so that they're shared and compared by identity first.
+        for name in ("filename", "error_code", "root_dir", "project"):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                object.__setattr__(self, name, sys.intern(value))
+
+        # Excluding `code_snippet`.
+        object.__setattr__(
+            self,
+            "_key",
+            (
+                self.filename,
+                self.line_number,
+                self.column_number,
+                self.error_message,
+                self.error_code,
+                self.root_dir,
+                self.project,
+                self.related_files,
+                self.context,
+            ),
+        )
+        object.__setattr__(
+            self,
+            "_key_wo_line_column",
+            (
+                self.filename,
+                self.error_message,
+                self.error_code,
+                self.root_dir,
+                self.project,
+            ),
         )
 
+    def __repr__(self):
+        if self._repr is None:
+            object.__setattr__(
+                self,
+                "_repr",
+                f"{self.filename}@({self.line_number}, {self.column_number}): "
+                f"[{self.error_code}] {self.error_message}.",
+            )
+
+        return self._repr
+
     def __eq__(self, other) -> bool:
-        return (
-            isinstance(other, self.__class__)
-            and self.filename == other.filename
-            and self.line_number == other.line_number
-            and self.column_number == other.column_number
-            and self.error_message == other.error_message
-            and self.error_code == other.error_code
-            and
-            # self.code_snippet == other.code_snippet and
-            self.root_dir == other.root_dir
-            and self.project == other.project
-            and self.related_files == other.related_files
-            and self.context == other.context
-        )
+        return isinstance(other, self.__class__) and self._key == other.key
+
+    @property
+    def key(self) -> Tuple[Any, ...]:
+        """Fields compared in `__eq__`."""
+        return self._key
+
+    @property
+    def key_wo_line_column(self) -> Tuple[Any, ...]:
+        """Fields compared in `equal_wo_line_column`, also hashed."""
+        return self._key_wo_line_column
+
+    def __hash__(self) -> int:
+        # Fields are a subset of the ones in `__eq__`.
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(self._key_wo_line_column))
+
+        return self._hash
 
     def str_wo_line_column(self) -> str:
         """Get str excluding line or column numbers."""
-        return f"{self.filename}: [{self.error_code}] {self.error_message}."
+        if self._str_wo_line_column is None:
+            object.__setattr__(
+                self,
+                "_str_wo_line_column",
+                f"{self.filename}: [{self.error_code}] {self.error_message}.",
+            )
+
+        return self._str_wo_line_column
 
     def equal_wo_line_column(self, other) -> bool:
         """Compare build errors excluding line or column numbers."""
         return (
             isinstance(other, self.__class__)
-            and self.filename == other.filename
-            and
-            # self.line_number == other.line_number and
-            # self.column_number == other.column_number and
-            self.error_message == other.error_message
-            and self.error_code == other.error_code
-            and
-            # self.code_snippet == other.code_snippet and
-            self.root_dir == other.root_dir
-            and self.project == other.project
+            and self._key_wo_line_column == other.key_wo_line_column
         )
 
 
+_KEY_WO_LINE_COLUMN = operator.attrgetter("key_wo_line_column")
+# Excluding root dir and project as well: The same error from another project is not new.
+_STR_WO_LINE_COLUMN = operator.methodcaller("str_wo_line_column")
+
+
+def _error_sort_key(error: BuildData) -> Tuple[Any, ...]:
+    """Sort by file, then line, column number given a file."""
+    return (
+        # TODO(sliuxl): Double check when filename is `None`.
+        error.filename is None,
+        error.filename or "",
+        error.project,
+        None if error.line_number is None else -int(error.line_number),
+        None if error.column_number is None else -int(error.column_number),
+        error.error_code,
+        error.error_message,
+    )
+
+
 class BaseBuilder(abc.ABC):
     """Base Builder."""
 
@@ -129,6 +253,7 @@ class BaseBuilder(abc.ABC):
         - BUILD_COMMAND
         - BUILD_ERROR_CHANGE_OPTIONS: Back up from `config` in `kwargs`
         - ENABLE_FEEDBACK: Back up from `config` in `kwargs`
+        - METRICS_ENABLED: Whether to run metrics, default to True
         """
         super().__init__()
 
@@ -161,8 +286,9 @@ class BaseBuilder(abc.ABC):
 
         self.kwargs = kwargs
         self.repo = self.kwargs.get("repo")
-        self._metrics = defaultdict(int)
+        self._metrics = Counter()
         self._rule_metrics = defaultdict(int)
+        self._metrics_enabled = kwargs.get(METRICS_ENABLED, True)
 
     def run_final_eval(self) -> bool:
         """Run final eval."""
@@ -175,88 +301,100 @@ class BaseBuilder(abc.ABC):
         aggregate: bool = False,
         max_count: int = 1000,
     ):
-        """Get metrics."""
-        self._metrics = defaultdict(int)
+        """Get metrics: Keys are tuples of `(tag, *fields)`, see `METRIC_KEY_FORMATS`.
+
+        Metrics are empty when they're disabled, see `METRICS_ENABLED`.
+        """
+        self._metrics = Counter()
+        if not self._metrics_enabled:
+            return self.metrics
+
+        metrics = self._metrics
 
         root_dir = self.root_dir
         if not root_dir.endswith(os.path.sep):
             root_dir += os.path.sep
 
-        self._metrics["00-start"] += 1
-        # self._metrics[f"01-filter--{root_dir}"] += 1
+        metrics["00-start"] += 1
+        # metrics[f"01-filter--{root_dir}"] += 1
 
         if os.path.exists(root_dir):
-            self._metrics["01-filter--dir-exists"] += 1
+            metrics["01-filter--dir-exists"] += 1
         else:
-            self._metrics["01-filter--dir-does-not-exist"] += 1
-            self._metrics["02-finish--early"] += 1
+            metrics["01-filter--dir-does-not-exist"] += 1
+            metrics["02-finish--early"] += 1
             # return self.metrics
 
-        self._metrics[f"02-build-errors--len={len(build_errors):03d}"] += 1
-        self._metrics[
-            f"02-build-errors--01--len-dir=<{len(build_errors):03d},{self.root_dir}>"
-        ] += 1
+        metrics[(METRIC_BUILD_ERRORS_LEN, len(build_errors))] += 1
+        metrics[(METRIC_BUILD_ERRORS_LEN_DIR, len(build_errors), self.root_dir)] += 1
+
+        # Count error codes in bulk, rather than one metric update per error.
+        error_code_counts = Counter([error.error_code for error in build_errors])
+        for code, count in error_code_counts.items():
+            metrics[(METRIC_ERROR_CODE, code)] += count
+
+        if aggregate:
+            error_counts = Counter(
+                [(error.error_code, error.error_message) for error in build_errors]
+            )
+        else:
+            error_code_counts = error_counts = Counter()
 
-        error_code_counts = defaultdict(int)
-        error_counts = defaultdict(int)
+        # Keys for all errors, counted with one bulk update in `Counter`.
+        line_keys = []
         for build_error in build_errors:
             code = build_error.error_code
-            self._metrics[f"03-00-build-error--code=<{code}>"] += 1
+            error_message = build_error.error_message
 
-            if aggregate:
-                error_code_counts[code] += 1
-                error_counts[f"[{code}]{build_error.error_message}"] += 1
+            # Non-empty stripped lines in one pass: Keep the ones before cutoff, count the rest.
+            stripped_lines = filter(None, map(str.strip, error_message.splitlines()))
+            lines = list(itertools.islice(stripped_lines, build_error_cutoff_lines))
+            num_lines = len(lines) + sum(1 for _ in stripped_lines)
 
-            lines = [
-                line
-                for line in build_error.error_message.split(os.linesep)
-                if line.strip()
-            ]
-            self._metrics[f"03-01-build-error--lines={len(lines):03d}"] += 1
-            if len(lines) > build_error_cutoff_lines:
-                self._metrics[
-                    f"03-02-build-error--lines={len(lines):03d}--file=<{build_error.filename}>"
-                ] += 1
-                lines = lines[:build_error_cutoff_lines]
-
-            for index, line in enumerate(lines):
-                self._metrics[
-                    f"04-{index:02d}-build-error--line{index:02d}=[{code}]<<<{line.strip()}>>>"
-                ] += 1
-
-            if build_error.filename is None:
-                self._metrics["05-00-build-error--file=NONE"] += 1
+            line_keys.append((METRIC_ERROR_LINES, num_lines))
+            if num_lines > build_error_cutoff_lines:
+                metrics[(METRIC_ERROR_LINES_FILE, num_lines, build_error.filename)] += 1
+
+            line_keys.extend(
+                [
+                    (METRIC_ERROR_LINE, index, code, line)
+                    for index, line in enumerate(lines)
+                ]
+            )
+        metrics.update(line_keys)
+
+        # File metrics once per unique (file, code), rather than once per error.
+        file_code_counts = Counter(
+            [(error.filename, error.error_code) for error in build_errors]
+        )
+        for (filename, code), count in file_code_counts.items():
+            if filename is None:
+                metrics["05-00-build-error--file=NONE"] += count
             else:
-                filename = build_error.filename.replace(root_dir, "")
-                suffix = filename.split(".")[-1]
+                filename = filename.removeprefix(root_dir)
+                suffix = filename.rpartition(".")[2]
 
-                self._metrics[f"05-00-build-error--file=<{filename}>"] += 1
-                self._metrics[f"05-01-build-error--file-suffix=<{suffix}>"] += 1
-                self._metrics[
-                    f"05-02-build-error--file-suffix-code=<{suffix},{code}>"
-                ] += 1
+                metrics[(METRIC_ERROR_FILE, filename)] += count
+                metrics[(METRIC_ERROR_FILE_SUFFIX, suffix)] += count
+                metrics[(METRIC_ERROR_FILE_SUFFIX_CODE, suffix, code)] += count
 
         for code, count in error_code_counts.items():
-            self._metrics[
-                f"05-03-build-error-code-count--~{max_count - count:03d}~<##{count:03d}##{code}>"
-            ] += 1
-        for error, count in error_counts.items():
-            self._metrics[
-                f"05-04-build-error-count--~{max_count - count:03d}~<##{count:03d}##{error}>"
-            ] += 1
-
-        self._metrics["06-finish"] += 1
+            metrics[(METRIC_ERROR_CODE_COUNT, max_count - count, count, code)] += 1
+        for (code, message), count in error_counts.items():
+            metrics[(METRIC_ERROR_COUNT, max_count - count, count, code, message)] += 1
+
+        metrics["06-finish"] += 1
         return self.metrics
 
     @property
     def metrics(self):
         """Get metrics."""
-        return metric_utils.reformat_metrics(self, self._metrics)
+        return metric_utils.reformat_metrics(self, format_metrics(self._metrics))
 
     @property
     def rule_metrics(self):
         """Get rule metrics."""
-        return metric_utils.reformat_metrics(self, self._rule_metrics)
+        return metric_utils.reformat_metrics(self, format_metrics(self._rule_metrics))
 
     @abc.abstractmethod
     def extract_build_errors(
@@ -274,16 +412,21 @@ class BaseBuilder(abc.ABC):
         """Suffix for the project file if applicable."""
         return None
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _project_suffixes(cls) -> Optional[Tuple[str]]:
+        """Suffixes for the project file if applicable: Constant per class."""
+        suffix = cls.project_suffix()
+        return None if suffix is None else tuple(suffix.split(","))
+
     @classmethod
     def is_project_file(cls, filename: str) -> Optional[bool]:
         """Suffix for the project file if applicable."""
-        suffix = cls.project_suffix()
-        if suffix is None:
+        suffixes = cls._project_suffixes()
+        if suffixes is None:
             return None
 
-        return filename is not None and any(
-            filename.endswith(s) for s in suffix.split(",")
-        )
+        return filename is not None and filename.endswith(suffixes)
 
     def _reset_feedback(self, reset: bool = True):
         """Reset feedback."""
@@ -374,38 +517,35 @@ class BaseBuilder(abc.ABC):
         self,
         previous_build_errors: Tuple[BuildData],
         latest_build_errors: Tuple[BuildData],
-        previous_grouped_errors: Dict[str, List[BuildData]],
-        latest_grouped_errors: Dict[str, List[BuildData]],
         update_feedback: bool = True,
     ) -> bool:
         """Compare build errors and see whether they change: Return bool of feedback is updated."""
-        if (
-            len(previous_build_errors) != len(latest_build_errors)
-            or len(previous_grouped_errors) != len(latest_grouped_errors)
-            or sorted(previous_grouped_errors.keys())
-            != sorted(latest_grouped_errors.keys())
+        # Same errors excluding line or column numbers, in the order grouped by file.
+        if len(previous_build_errors) != len(latest_build_errors) or list(
+            map(_KEY_WO_LINE_COLUMN, sorted(previous_build_errors, key=_error_sort_key))
+        ) != list(
+            map(_KEY_WO_LINE_COLUMN, sorted(latest_build_errors, key=_error_sort_key))
         ):
             return False
 
-        # Assuming both are sorted for a given file.
-        for filename, previous_file_errors in previous_grouped_errors.items():
-            latest_file_errors = latest_grouped_errors[filename]
-
-            for prev_error, curr_error in zip(previous_file_errors, latest_file_errors):
-                if not prev_error.equal_wo_line_column(curr_error):
-                    return False
-
         if update_feedback:
             self.feedback.append(BUILD_ERRORS_DO_NOT_CHANGE_AS_FEEDBACK)
         return True
 
     @classmethod
     def _errors_to_str(
-        cls, errors: Sequence[BuildData], prefix="{index}/{count}: "
+        cls, errors: Sequence[BuildData], prefix=ERRORS_TO_STR_PREFIX
     ) -> str:
+        count = len(errors)
+        if prefix == ERRORS_TO_STR_PREFIX:
+            # Default prefix: No need to parse the format string for every error.
+            return "\n".join(
+                [f"{index}/{count}: {error}" for index, error in enumerate(errors)]
+            )
+
         return "\n".join(
             [
-                f"{prefix.format(index=index, count=len(errors))}{str(error)}"
+                f"{prefix.format(index=index, count=count)}{error}"
                 for index, error in enumerate(errors)
             ]
         )
@@ -414,15 +554,11 @@ class BaseBuilder(abc.ABC):
         self,
         previous_build_errors: Tuple[BuildData],
         latest_build_errors: Tuple[BuildData],
-        previous_grouped_errors: Dict[str, List[BuildData]],
-        latest_grouped_errors: Dict[str, List[BuildData]],
     ):
         """Compare build errors and they should be non-increasing."""
         self._update_feedback_errors_decreasing(
             previous_build_errors,
             latest_build_errors[1:],
-            previous_grouped_errors,
-            latest_grouped_errors,
             BUILD_ERRORS_INCREASING_AS_FEEDBACK,
         )
 
@@ -430,60 +566,31 @@ class BaseBuilder(abc.ABC):
         self,
         previous_build_errors: Tuple[BuildData],
         latest_build_errors: Tuple[BuildData],
-        previous_grouped_errors: Dict[str, List[BuildData]],
-        latest_grouped_errors: Dict[str, List[BuildData]],
         error_msg: str = BUILD_ERRORS_NON_DECREASING_AS_FEEDBACK,
     ):
         """Compare build errors and they should decrease."""
-        del previous_grouped_errors
-        del latest_grouped_errors
-
         if len(previous_build_errors) <= len(latest_build_errors):
             self.feedback.append(error_msg)
             return
 
-        # TODO(sliuxl): A better way is to implement a hash function for `BuildData`.
-        def _to_str(error):
-            return error.str_wo_line_column()
-
-        prev_errors = set()
-        for prev_error in previous_build_errors:
-            prev_errors.add(_to_str(prev_error))
-
-        for curr_error in latest_build_errors:
-            if _to_str(curr_error) not in prev_errors:
-                self.feedback.append(error_msg)
-                return
+        prev_errors = set(map(_STR_WO_LINE_COLUMN, previous_build_errors))
+        if any(
+            key not in prev_errors
+            for key in map(_STR_WO_LINE_COLUMN, latest_build_errors)
+        ):
+            self.feedback.append(error_msg)
 
     def group_errors_by_file(
         self, build_errors: Tuple[BuildData]
     ) -> Dict[str, List[BuildData]]:
         """Group errors by file."""
-        file_errors = defaultdict(list)
-        for build_error in build_errors:
-            # TODO(sliuxl): Double check when filename is `None`.
-            file_errors[build_error.filename].append(build_error)
-
-        # Sort by line, column number given a file.
-        def _sorted(errors):
-            errors = [
-                (
-                    error.filename,
-                    error.project,
-                    None if error.line_number is None else -int(error.line_number),
-                    None if error.column_number is None else -int(error.column_number),
-                    error.error_code,
-                    error.error_message,
-                    error,
-                )
-                for error in errors
-            ]
-
-            errors = sorted(errors)
-            return [error[-1] for error in errors]
-
-        file_errors = {f: _sorted(errors) for f, errors in file_errors.items()}
-        return file_errors
+        return {
+            filename: list(errors)
+            for filename, errors in itertools.groupby(
+                sorted(build_errors, key=_error_sort_key),
+                key=operator.attrgetter("filename"),
+            )
+        }
 
     def _update_feedback(
         self,
@@ -511,11 +618,11 @@ class BaseBuilder(abc.ABC):
         if candidate is None:
             return
 
-        previous_group_errors = self.group_errors_by_file(previous_build_errors)
-        latest_group_errors = self.group_errors_by_file(latest_build_errors)
-
-        # Step 1: Project errors.
-        if self.project_suffix() and not self.project_suffix().endswith("pom.xml"):
+        # Step 1: Project errors, grouping errors only when they're used.
+        project_suffix = self.project_suffix()
+        if project_suffix and not project_suffix.endswith("pom.xml"):
+            previous_group_errors = self.group_errors_by_file(previous_build_errors)
+            latest_group_errors = self.group_errors_by_file(latest_build_errors)
 
             def _get_projects(group_errors):
                 return [
@@ -542,19 +649,15 @@ class BaseBuilder(abc.ABC):
                 return
 
         # Step 2: Source code errors.
-        candidate(
-            previous_build_errors,
-            latest_build_errors,
-            previous_group_errors,
-            latest_group_errors,
-        )
+        candidate(previous_build_errors, latest_build_errors)
 
     def run(self, *args, **kwargs) -> Union[Tuple[BuildData], str]:
         """Apply patches by file."""
         update_errors = kwargs.get("update_errors", True)
         if update_errors:
             self._reset_feedback()
-            previous_build_errors = self.previous_build_errors[:]
+            # Tuples are immutable: No need to copy.
+            previous_build_errors = self.previous_build_errors
 
         latest_build_errors = self.build(*args, **kwargs)
 
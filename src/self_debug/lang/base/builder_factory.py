@@ -13,13 +13,14 @@ BaseBuilder = builder.BaseBuilder
 BuildData = builder.BuildData
 CmdData = builder.CmdData
 
+# Both `CamelCase` and `snake_case` names.
+BUILDER_CLASSES = utils.get_class_names((maven_builder.MavenBuilder,))
+
 
 def create_builder(option: Any, *args, **kwargs) -> BaseBuilder:
     """Create builder based on its name: Option can be a string (infer class name) or a config."""
     logging.info("[factory] Create builder: `%s`.", option)
 
-    classes = (maven_builder.MavenBuilder,)
-
     if isinstance(option, str):
         config_kwargs = kwargs
     else:
@@ -30,4 +31,4 @@ def create_builder(option: Any, *args, **kwargs) -> BaseBuilder:
         }
         config_kwargs.update(kwargs)
 
-    return utils.create_instance(option, classes, *args, **config_kwargs)
+    return utils.create_instance(option, BUILDER_CLASSES, *args, **config_kwargs)
@@ -1,11 +1,11 @@
 """Unit test for builder.py."""
 
 from collections import defaultdict
+import dataclasses
 import logging
 from typing import Tuple
 import unittest
 
-from parameterized import parameterized
 from self_debug.proto import builder_pb2
 
 from self_debug.common import utils
@@ -75,6 +75,268 @@ FEEDBACK_ERRORS_NON_DECREASING = "[Feedback Start]The build errors don't decreas
 # pylint: enable=line-too-long
 
 
+_REPR_CASES = (
+    (
+        BUILD_DATA_00,
+        "<filename>@(1, 2): [None] <error msg>.",
+        "<filename>: [None] <error msg>.",
+    ),
+    (
+        BUILD_DATA_00_AGAIN,
+        "<filename>@(1, 2): [None] <error msg>.",
+        "<filename>: [None] <error msg>.",
+    ),
+    (
+        BUILD_DATA_01,
+        "<filename>@(1, 2): [None] <error msg>.",
+        "<filename>: [None] <error msg>.",
+    ),
+    (
+        BUILD_DATA_03,
+        "test03.py@(1, None): [CS0123] <error msg>.",
+        "test03.py: [CS0123] <error msg>.",
+    ),
+)
+
+
+_BUILD_DATA_CASES = (
+    (
+        BUILD_DATA_00,
+        BUILD_DATA_00,
+        True,
+        True,
+    ),
+    (
+        BUILD_DATA_00,
+        BUILD_DATA_00_AGAIN,
+        True,
+        True,
+    ),
+    (
+        BUILD_DATA_00,
+        BUILD_DATA_01,
+        False,
+        True,
+    ),
+    (
+        BUILD_DATA_00,
+        BUILD_DATA_02,
+        False,
+        True,
+    ),
+    (
+        BUILD_DATA_01,
+        BUILD_DATA_02,
+        False,
+        True,
+    ),
+    (
+        BUILD_DATA_00,
+        BUILD_DATA_03,
+        False,
+        False,
+    ),
+)
+
+
+_UPDATE_FEEDBACK_CASES = (
+    # With feedback.
+    (
+        (BUILD_DATA_00,),
+        (BUILD_DATA_00_AGAIN,),
+        {
+            "enable_feedback": True,
+        },
+        FEEDBACK_ERRORS_NO_CHANGE,
+    ),
+    (
+        (BUILD_DATA_00_AGAIN,),
+        (BUILD_DATA_00,),
+        {
+            "enable_feedback": True,
+        },
+        FEEDBACK_ERRORS_NO_CHANGE,
+    ),
+    (
+        (BUILD_DATA_00,),
+        (BUILD_DATA_01,),
+        {
+            "enable_feedback": True,
+        },
+        FEEDBACK_ERRORS_NO_CHANGE,
+    ),
+    (
+        (
+            BUILD_DATA_00,
+            BUILD_DATA_03,
+        ),
+        (
+            BUILD_DATA_03,
+            BUILD_DATA_00,
+        ),
+        {
+            "enable_feedback": True,
+        },
+        FEEDBACK_ERRORS_NO_CHANGE,
+    ),
+    (
+        (
+            BUILD_DATA_00,
+            BUILD_DATA_03,
+        ),
+        (
+            BUILD_DATA_02,
+            BUILD_DATA_03,
+        ),
+        {
+            "enable_feedback": True,
+        },
+        FEEDBACK_ERRORS_NO_CHANGE,
+    ),
+    (
+        (
+            BUILD_DATA_03,
+            BUILD_DATA_00,
+        ),
+        (
+            BUILD_DATA_04,
+            BUILD_DATA_03,
+            BUILD_DATA_00,
+        ),
+        {
+            "build_error_change_option": (
+                builder_pb2.Builder.BuildErrorChangeOption.ERRORS_NON_INCREASING
+            ),
+            "enable_feedback": True,
+        },
+        FEEDBACK_ERRORS_INCREASING,
+    ),
+    (
+        (
+            BUILD_DATA_03,
+            BUILD_DATA_00,
+        ),
+        (
+            # A new error.
+            BUILD_DATA_04,
+            BUILD_DATA_00,
+        ),
+        {
+            "build_error_change_option": (
+                builder_pb2.Builder.BuildErrorChangeOption.ERRORS_DECREASING
+            ),
+            "enable_feedback": True,
+        },
+        FEEDBACK_ERRORS_NON_DECREASING,
+    ),
+    # Without feedback.
+    (
+        # Errors swap lines in the same file: Compared in order.
+        (
+            {**BUILD_DATA_00, "line_number": 10},
+            {**BUILD_DATA_00, "error_message": "<another>", "line_number": 20},
+        ),
+        (
+            {**BUILD_DATA_00, "line_number": 20},
+            {**BUILD_DATA_00, "error_message": "<another>", "line_number": 10},
+        ),
+        {
+            "enable_feedback": True,
+        },
+        None,
+    ),
+    (
+        # Same files, but different number of errors per file.
+        (
+            BUILD_DATA_00,
+            BUILD_DATA_02,
+            BUILD_DATA_03,
+        ),
+        (
+            BUILD_DATA_00,
+            BUILD_DATA_03,
+            {**BUILD_DATA_03, "line_number": 10},
+        ),
+        {
+            "enable_feedback": True,
+        },
+        None,
+    ),
+    (
+        # Turned off.
+        (BUILD_DATA_00,),
+        (BUILD_DATA_00,),
+        {
+            # "enable_feedback": False,
+        },
+        None,
+    ),
+    (
+        (BUILD_DATA_00,),
+        (BUILD_DATA_03,),
+        {
+            "enable_feedback": True,
+        },
+        None,
+    ),
+    (
+        (
+            BUILD_DATA_03,
+            BUILD_DATA_00,
+        ),
+        (
+            BUILD_DATA_04,
+            BUILD_DATA_00_AGAIN,
+        ),
+        {
+            "build_error_change_option": (
+                builder_pb2.Builder.BuildErrorChangeOption.ERRORS_NON_INCREASING
+            ),
+            "enable_feedback": True,
+        },
+        None,
+    ),
+    (
+        (
+            BUILD_DATA_00,
+            BUILD_DATA_03,
+        ),
+        (
+            # Fixed: BUILD_DATA_00,
+            BUILD_DATA_03,
+        ),
+        {
+            "build_error_change_option": (
+                builder_pb2.Builder.BuildErrorChangeOption.ERRORS_DECREASING
+            ),
+            "enable_feedback": True,
+        },
+        None,
+    ),
+    (
+        (
+            BUILD_DATA_00,
+            BUILD_DATA_03,
+        ),
+        (
+            # Fixed: BUILD_DATA_00, the other one is reported from another project.
+            {
+                **BUILD_DATA_03,
+                "root_dir": "<another root_dir>",
+                "project": "<another project>",
+            },
+        ),
+        {
+            "build_error_change_option": (
+                builder_pb2.Builder.BuildErrorChangeOption.ERRORS_DECREASING
+            ),
+            "enable_feedback": True,
+        },
+        None,
+    ),
+)
+
+
 class Builder(builder.BaseBuilder):
     """Builder."""
 
@@ -87,252 +349,138 @@ class Builder(builder.BaseBuilder):
         return ()
 
 
+class ProjectBuilder(Builder):
+    """Builder with project files."""
+
+    @classmethod
+    def project_suffix(cls):
+        """Suffix for the project file."""
+        return ".csproj,.vbproj"
+
+
 class TestBuilder(unittest.TestCase):
     """Unit test for Builder."""
 
-    @parameterized.expand(
-        (
-            (
-                BUILD_DATA_00,
-                "<filename>@(1, 2): [None] <error msg>.",
-                "<filename>: [None] <error msg>.",
-            ),
-            (
-                BUILD_DATA_00_AGAIN,
-                "<filename>@(1, 2): [None] <error msg>.",
-                "<filename>: [None] <error msg>.",
-            ),
-            (
-                BUILD_DATA_01,
-                "<filename>@(1, 2): [None] <error msg>.",
-                "<filename>: [None] <error msg>.",
-            ),
-            (
-                BUILD_DATA_03,
-                "test03.py@(1, None): [CS0123] <error msg>.",
-                "test03.py: [CS0123] <error msg>.",
-            ),
-        )
-    )
-    def test_repr(self, kwargs, expected_str: str, expected_short_str: str):
+    def test_repr(self):
         """Unit test for create_builder."""
-        data = builder.BuildData(**kwargs)
-        self.assertEqual(str(data), expected_str)
-        self.assertEqual(data.str_wo_line_column(), expected_short_str)
+        for index, (kwargs, expected_str, expected_short_str) in enumerate(_REPR_CASES):
+            with self.subTest(index=index):
+                data = builder.BuildData(**kwargs)
+                self.assertEqual(str(data), expected_str)
+                self.assertEqual(data.str_wo_line_column(), expected_short_str)
 
-    @parameterized.expand(
-        (
-            (
-                BUILD_DATA_00,
-                BUILD_DATA_00,
-                True,
-                True,
-            ),
-            (
-                BUILD_DATA_00,
-                BUILD_DATA_00_AGAIN,
-                True,
-                True,
-            ),
-            (
-                BUILD_DATA_00,
-                BUILD_DATA_01,
-                False,
-                True,
-            ),
-            (
-                BUILD_DATA_00,
-                BUILD_DATA_02,
-                False,
-                True,
-            ),
-            (
-                BUILD_DATA_01,
-                BUILD_DATA_02,
-                False,
-                True,
-            ),
-            (
-                BUILD_DATA_00,
-                BUILD_DATA_03,
-                False,
-                False,
-            ),
-        )
-    )
-    def test_build_data(self, lhs, rhs, expected_equal, expected_equal2):
+    def test_build_data(self):
         """Unit test for create_builder."""
-        lhs = builder.BuildData(**lhs)
-        rhs = builder.BuildData(**rhs)
+        for index, (lhs, rhs, expected_equal, expected_equal2) in enumerate(
+            _BUILD_DATA_CASES
+        ):
+            with self.subTest(index=index):
+                lhs = builder.BuildData(**lhs)
+                rhs = builder.BuildData(**rhs)
 
-        self.assertEqual(lhs == rhs, expected_equal)
-        self.assertEqual(rhs == lhs, expected_equal)
+                self.assertEqual(lhs == rhs, expected_equal)
+                self.assertEqual(rhs == lhs, expected_equal)
+                if expected_equal:
+                    self.assertEqual(hash(lhs), hash(rhs))
+                    self.assertEqual(len({lhs, rhs}), 1)
 
-        # pylint: disable=singleton-comparison
-        self.assertFalse(lhs == None)
-        self.assertTrue(lhs != None)
-        # pylint: enable=singleton-comparison
+                # pylint: disable=singleton-comparison
+                self.assertFalse(lhs == None)
+                self.assertTrue(lhs != None)
+                # pylint: enable=singleton-comparison
 
-        self.assertNotEqual(lhs, None)
-        self.assertNotEqual(None, lhs)
+                self.assertNotEqual(lhs, None)
+                self.assertNotEqual(None, lhs)
 
-        # Symmetric.
-        self.assertEqual(lhs.equal_wo_line_column(rhs), expected_equal2)
-        self.assertEqual(rhs.equal_wo_line_column(lhs), expected_equal2)
+                # Symmetric.
+                self.assertEqual(lhs.equal_wo_line_column(rhs), expected_equal2)
+                self.assertEqual(rhs.equal_wo_line_column(lhs), expected_equal2)
+                self.assertEqual(
+                    lhs.key_wo_line_column == rhs.key_wo_line_column, expected_equal2
+                )
 
-    @parameterized.expand(
-        (
-            # With feedback.
-            (
-                (BUILD_DATA_00,),
-                (BUILD_DATA_00_AGAIN,),
-                {
-                    "enable_feedback": True,
-                },
-                FEEDBACK_ERRORS_NO_CHANGE,
-            ),
-            (
-                (BUILD_DATA_00_AGAIN,),
-                (BUILD_DATA_00,),
-                {
-                    "enable_feedback": True,
-                },
-                FEEDBACK_ERRORS_NO_CHANGE,
-            ),
-            (
-                (BUILD_DATA_00,),
-                (BUILD_DATA_01,),
-                {
-                    "enable_feedback": True,
-                },
-                FEEDBACK_ERRORS_NO_CHANGE,
-            ),
-            (
-                (
-                    BUILD_DATA_00,
-                    BUILD_DATA_03,
-                ),
-                (
-                    BUILD_DATA_03,
-                    BUILD_DATA_00,
-                ),
-                {
-                    "enable_feedback": True,
-                },
-                FEEDBACK_ERRORS_NO_CHANGE,
-            ),
-            (
-                (
-                    BUILD_DATA_00,
-                    BUILD_DATA_03,
-                ),
-                (
-                    BUILD_DATA_02,
-                    BUILD_DATA_03,
-                ),
-                {
-                    "enable_feedback": True,
-                },
-                FEEDBACK_ERRORS_NO_CHANGE,
-            ),
-            (
-                (
-                    BUILD_DATA_03,
-                    BUILD_DATA_00,
-                ),
-                (
-                    BUILD_DATA_04,
-                    BUILD_DATA_03,
-                    BUILD_DATA_00,
-                ),
-                {
-                    "build_error_change_option": (
-                        builder_pb2.Builder.BuildErrorChangeOption.ERRORS_NON_INCREASING
-                    ),
-                    "enable_feedback": True,
-                },
-                FEEDBACK_ERRORS_INCREASING,
-            ),
-            (
-                (
-                    BUILD_DATA_03,
-                    BUILD_DATA_00,
-                ),
-                (
-                    # A new error.
-                    BUILD_DATA_04,
-                    BUILD_DATA_00,
-                ),
-                {
-                    "build_error_change_option": (
-                        builder_pb2.Builder.BuildErrorChangeOption.ERRORS_DECREASING
-                    ),
-                    "enable_feedback": True,
-                },
-                FEEDBACK_ERRORS_NON_DECREASING,
-            ),
-            # Without feedback.
-            (
-                # Turned off.
-                (BUILD_DATA_00,),
-                (BUILD_DATA_00,),
-                {
-                    # "enable_feedback": False,
-                },
-                None,
-            ),
-            (
-                (BUILD_DATA_00,),
-                (BUILD_DATA_03,),
-                {
-                    "enable_feedback": True,
-                },
-                None,
-            ),
+                # Frozen: Keys and hash can't go stale.
+                with self.assertRaises(dataclasses.FrozenInstanceError):
+                    lhs.line_number = 0
+
+    def test_update_feedback(self):
+        """Unit test for create_builder."""
+        for index, (lhs, rhs, kwargs, expected_feedback) in enumerate(
+            _UPDATE_FEEDBACK_CASES
+        ):
+            with self.subTest(index=index):
+                lhs = tuple(builder.BuildData(**kwargs) for kwargs in lhs)
+                rhs = tuple(builder.BuildData(**kwargs) for kwargs in rhs)
+
+                bld = Builder("root_dir", **kwargs)
+                bld._update_feedback(lhs, rhs)
+                self.assertEqual(bld.collect_feedback(), expected_feedback)
+
+    def test_is_project_file(self):
+        """Unit test for is_project_file."""
+        for index, (cls, filename, expected_is_project_file) in enumerate(
             (
-                (
-                    BUILD_DATA_03,
-                    BUILD_DATA_00,
-                ),
-                (
-                    BUILD_DATA_04,
-                    BUILD_DATA_00_AGAIN,
-                ),
-                {
-                    "build_error_change_option": (
-                        builder_pb2.Builder.BuildErrorChangeOption.ERRORS_NON_INCREASING
-                    ),
-                    "enable_feedback": True,
-                },
-                None,
-            ),
+                (Builder, "test.csproj", None),
+                (Builder, None, None),
+                (ProjectBuilder, "test.csproj", True),
+                (ProjectBuilder, "test.vbproj", True),
+                (ProjectBuilder, "test.cs", False),
+                (ProjectBuilder, None, False),
+            )
+        ):
+            with self.subTest(index=index):
+                self.assertEqual(
+                    cls.is_project_file(filename), expected_is_project_file
+                )
+                # Cached.
+                self.assertEqual(
+                    cls.is_project_file(filename), expected_is_project_file
+                )
+
+    def test_errors_to_str(self):
+        """Unit test for _errors_to_str."""
+        errors = (
+            builder.BuildData(**BUILD_DATA_00),
+            builder.BuildData(**BUILD_DATA_03),
+        )
+        for index, (args, expected_str) in enumerate(
             (
                 (
-                    BUILD_DATA_00,
-                    BUILD_DATA_03,
+                    (),
+                    "0/2: <filename>@(1, 2): [None] <error msg>.\n"
+                    "1/2: test03.py@(1, None): [CS0123] <error msg>.",
                 ),
                 (
-                    # Fixed: BUILD_DATA_00,
-                    BUILD_DATA_03,
+                    ("- {index:02d} of {count}: ",),
+                    "- 00 of 2: <filename>@(1, 2): [None] <error msg>.\n"
+                    "- 01 of 2: test03.py@(1, None): [CS0123] <error msg>.",
                 ),
-                {
-                    "build_error_change_option": (
-                        builder_pb2.Builder.BuildErrorChangeOption.ERRORS_DECREASING
-                    ),
-                    "enable_feedback": True,
-                },
-                None,
-            ),
+            )
+        ):
+            with self.subTest(index=index):
+                self.assertEqual(Builder._errors_to_str(errors, *args), expected_str)
+        self.assertEqual(Builder._errors_to_str(()), "")
+
+    def test_group_errors_by_file(self):
+        """Unit test for group_errors_by_file."""
+        kwargs_list = (
+            BUILD_DATA_00,
+            BUILD_DATA_03,
+            BUILD_DATA_04,
+            BUILD_DATA_02,
         )
-    )
-    def test_update_feedback(self, lhs, rhs, kwargs, expected_feedback):
-        """Unit test for create_builder."""
-        lhs = tuple(builder.BuildData(**kwargs) for kwargs in lhs)
-        rhs = tuple(builder.BuildData(**kwargs) for kwargs in rhs)
+        build_errors = tuple(builder.BuildData(**kwargs) for kwargs in kwargs_list)
 
-        bld = Builder("root_dir", **kwargs)
-        bld._update_feedback(lhs, rhs)
-        self.assertEqual(bld.collect_feedback(), expected_feedback)
+        file_errors = Builder("root_dir").group_errors_by_file(build_errors)
+        self.assertEqual(
+            file_errors,
+            {
+                # Sorted by line and column numbers in decreasing order.
+                "<filename>": [build_errors[3], build_errors[0]],
+                "test03.py": [build_errors[1]],
+                None: [build_errors[2]],
+            },
+        )
 
     def test_run_metrics(self):
         """Unit test for run_metrics."""
@@ -395,6 +543,40 @@ class TestBuilder(unittest.TestCase):
         )
         self.assertEqual(metrics, expected_metrics)
 
+        # Metrics are disabled.
+        metrics = Builder("root_dir", metrics_enabled=False).run_metrics(build_errors)
+        self.assertEqual(metrics, defaultdict(int))
+
+        # Run with multi-line build errors.
+        build_errors = (
+            builder.BuildData(
+                filename="root_dir/test.py",
+                line_number=1,
+                error_message="  line 0\n\n  line 1  \nline 2\n",
+            ),
+        )
+        metrics = bld.run_metrics(build_errors, build_error_cutoff_lines=2)
+        expected_metrics = defaultdict(
+            int,
+            {
+                "Builder::00-start": 1,
+                "Builder::01-filter--dir-does-not-exist": 1,
+                "Builder::02-build-errors--len=001": 1,
+                "Builder::02-build-errors--01--len-dir=<001,root_dir>": 1,
+                "Builder::02-finish--early": 1,
+                "Builder::03-00-build-error--code=<None>": 1,
+                "Builder::03-01-build-error--lines=003": 1,
+                "Builder::03-02-build-error--lines=003--file=<root_dir/test.py>": 1,
+                "Builder::04-00-build-error--line00=[None]<<<line 0>>>": 1,
+                "Builder::04-01-build-error--line01=[None]<<<line 1>>>": 1,
+                "Builder::05-00-build-error--file=<test.py>": 1,
+                "Builder::05-01-build-error--file-suffix=<py>": 1,
+                "Builder::05-02-build-error--file-suffix-code=<py,None>": 1,
+                "Builder::06-finish": 1,
+            },
+        )
+        self.assertEqual(metrics, expected_metrics)
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG, format=utils.LOGGING_FORMAT)
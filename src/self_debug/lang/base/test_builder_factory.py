@@ -3,7 +3,6 @@
 import logging
 import unittest
 
-from parameterized import parameterized
 from self_debug.proto import builder_pb2
 
 from self_debug.common import utils
@@ -27,47 +26,53 @@ MAVEN_TEXT_PROTO = """
 """
 
 
+_CREATE_BUILDER_CASES = (
+    # From args, kwargs.
+    (
+        ("MavenBuilder",) + MAVEN_BUILDER_ARGS,
+        MAVEN_BUILDER_KWARGS,
+        maven_builder.MavenBuilder,
+        "/java/project_dir",
+        "cd /java/project_dir; mvn clean verify",
+    ),
+    (
+        ("maven_builder",) + MAVEN_BUILDER_ARGS,
+        MAVEN_BUILDER_KWARGS,
+        maven_builder.MavenBuilder,
+        "/java/project_dir",
+        "cd /java/project_dir; mvn clean verify",
+    ),
+    # From config.
+    (
+        (utils.parse_proto_cached(MAVEN_TEXT_PROTO, builder_pb2.Builder),),
+        {},
+        maven_builder.MavenBuilder,
+        "/tmp/java/projects/xmpp-light",
+        "cd /tmp/java/projects/xmpp-light; mvn clean verify",
+    ),
+)
+
+
 class TestBuilder(unittest.TestCase):
     """Unit test for Builder."""
 
-    @parameterized.expand(
-        (
-            # From args, kwargs.
-            (
-                ("MavenBuilder",) + MAVEN_BUILDER_ARGS,
-                MAVEN_BUILDER_KWARGS,
-                maven_builder.MavenBuilder,
-                "/java/project_dir",
-                "cd /java/project_dir; mvn clean verify",
-            ),
-            (
-                ("maven_builder",) + MAVEN_BUILDER_ARGS,
-                MAVEN_BUILDER_KWARGS,
-                maven_builder.MavenBuilder,
-                "/java/project_dir",
-                "cd /java/project_dir; mvn clean verify",
-            ),
-            # From config.
-            (
-                (utils.parse_proto(MAVEN_TEXT_PROTO, builder_pb2.Builder),),
-                {},
-                maven_builder.MavenBuilder,
-                "/tmp/java/projects/xmpp-light",
-                "cd /tmp/java/projects/xmpp-light; mvn clean verify",
-            ),
-        )
-    )
-    def test_create_builder(
-        self, args, kwargs, expected_class, expected_root_dir, expected_command
-    ):
+    def test_create_builder(self):
         """Unit test for create_builder."""
-        builder = builder_factory.create_builder(*args, **kwargs)
+        for index, (
+            args,
+            kwargs,
+            expected_class,
+            expected_root_dir,
+            expected_command,
+        ) in enumerate(_CREATE_BUILDER_CASES):
+            with self.subTest(index=index):
+                builder = builder_factory.create_builder(*args, **kwargs)
 
-        self.assertIsInstance(builder, builder_factory.BaseBuilder)
-        self.assertIsInstance(builder, expected_class)
+                self.assertIsInstance(builder, builder_factory.BaseBuilder)
+                self.assertIsInstance(builder, expected_class)
 
-        self.assertEqual(builder.root_dir, expected_root_dir)
-        self.assertEqual(builder.command, expected_command)
+                self.assertEqual(builder.root_dir, expected_root_dir)
+                self.assertEqual(builder.command, expected_command)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,6 @@
 import logging
 import unittest
 
-from parameterized import parameterized
-
 from self_debug.lang.base import utils
 
 
@@ -16,77 +14,86 @@ class TestUtils(unittest.TestCase):
         "remove_strip_lines": True,
     }
 
-    @parameterized.expand(
+    _SPLIT_ERRORS_CASES = (
         (
+            "",
+            {},
+            (),
+        ),
+        (
+            "  \n",
+            {},
+            (),
+        ),
+        (
+            "echo 'hello world'  \nhello   ",
+            {},
             (
-                "",
-                {},
-                (),
-            ),
-            (
-                "  \n",
-                {},
-                (),
-            ),
-            (
-                "echo 'hello world'  \nhello   ",
-                {},
-                (
-                    "echo 'hello world'  ",
-                    "hello",
-                ),
+                "echo 'hello world'  ",
+                "hello",
             ),
+        ),
+        (
+            "hello\n\n \n hello",
+            {},
             (
-                "hello\n\n \n hello",
-                {},
-                (
-                    "hello",
-                    "",
-                    " \n hello",
-                ),
+                "hello",
+                "",
+                " \n hello",
             ),
+        ),
+        (
+            "hello\n\n \n hello",
+            {
+                "remove_empty_lines": True,
+                # "remove_strip_lines": False,
+            },
             (
-                "hello\n\n \n hello",
-                {
-                    "remove_empty_lines": True,
-                    # "remove_strip_lines": False,
-                },
-                (
-                    "hello",
-                    " \n hello",
-                ),
+                "hello",
+                " \n hello",
             ),
+        ),
+        (
+            "hello\n\n \n hello",
+            _REMOVE_EMPTY_LINES,
             (
-                "hello\n\n \n hello",
-                _REMOVE_EMPTY_LINES,
-                (
-                    "hello",
-                    " hello",
-                ),
+                "hello",
+                " hello",
             ),
+        ),
+        (
+            "  test  \necho 'hello world'  \n hello\n   \n  hello\nhello, world.",
+            {},
             (
-                "  test  \necho 'hello world'  \n hello\n   \n  hello\nhello, world.",
-                {},
-                (
-                    "test  ",
-                    "echo 'hello world'  \n hello\n   \n  hello",
-                    "hello, world.",
-                ),
+                "test  ",
+                "echo 'hello world'  \n hello\n   \n  hello",
+                "hello, world.",
             ),
+        ),
+        (
+            "  test  \necho 'hello world'  \n hello\n   \n  hello\nhello, world.",
+            _REMOVE_EMPTY_LINES,
             (
-                "  test  \necho 'hello world'  \n hello\n   \n  hello\nhello, world.",
-                _REMOVE_EMPTY_LINES,
-                (
-                    "test  ",
-                    "echo 'hello world'  \n hello\n  hello",
-                    "hello, world.",
-                ),
+                "test  ",
+                "echo 'hello world'  \n hello\n  hello",
+                "hello, world.",
             ),
-        )
+        ),
+        (
+            # Many empty lines: No recursion.
+            "hello\n\n" * 2000,
+            {},
+            ("hello", "") * 1999 + ("hello",),
+        ),
     )
-    def test_split_errors(self, stdout, kwargs, expected_errors):
+
+    def test_split_errors(self):
         """Unit tests for split_errors."""
-        self.assertEqual(utils.split_errors(stdout, **kwargs), expected_errors)
+        for index, (stdout, kwargs, expected_errors) in enumerate(
+            self._SPLIT_ERRORS_CASES
+        ):
+            with self.subTest(index=index):
+                self.assertEqual(utils.split_errors(stdout, **kwargs), expected_errors)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 """Util functions."""
 
-import logging
 from typing import Tuple
 
 
@@ -16,24 +15,20 @@ def split_errors(
     remove_empty_lines = remove_empty_lines or remove_strip_lines
 
     errors = []
-    while lines:
-        line, lines = lines[0], lines[1:]
+    # An empty line starts a new block: Indented lines are not appended to previous blocks.
+    block_start = 0
+    for line in lines:
         if not line:
-            return (
-                tuple(errors)
-                + (() if remove_empty_lines else ("",))
-                + split_errors(lines, remove_empty_lines, remove_strip_lines)
-            )
+            if not remove_empty_lines:
+                errors.append("")
+            block_start = len(errors)
+            continue
 
-        logging.debug("`%s` ==> `%s`, `%s` ...", line, remove_strip_lines, line.strip())
         if remove_strip_lines and not line.strip():
             continue
 
-        if line.startswith(" "):
-            if errors:
-                errors[-1] += f"\n{line}"
-            else:
-                errors.append(line)
+        if line.startswith(" ") and len(errors) > block_start:
+            errors[-1] += f"\n{line}"
         else:
             errors.append(line)
 
@@ -3,8 +3,7 @@
 import logging
 import os
 import tempfile
-from typing import Any, Tuple
-import xml.etree.ElementTree as ET
+from typing import Any, Sequence, Tuple
 
 from self_debug.common import utils
 from self_debug.lang.base import ast_parser
@@ -23,7 +22,26 @@ PACKAGE_VERSION = "Version"
 
 ROOT_DIR = "root_dir"
 
+DEPENDENCIES = "dependencies"
+DEPENDENCY = "dependency"
+POM_NAMESPACES = ("{http://maven.apache.org/POM/4.0.0}", "")
+# Tag => PackageData field, per namespace.
+DEPENDENCY_FIELDS = {
+    namespace: {
+        f"{namespace}artifactId": "artifact_id",
+        f"{namespace}groupId": "name",
+        f"{namespace}version": "version",
+    }
+    for namespace in POM_NAMESPACES
+}
+
 JAVA_AST_BINARY = "lang/java/native/target/qct-ast-parser-1.0-jar-with-dependencies.jar"
+# Files per JVM run: A failed run loses this many ASTs at most.
+AST_BATCH_MAX_FILES = 256
+
+# Export ASTs to tmpfs if available: They're read back right away.
+SHM_DIR = "/dev/shm"
+TEMP_DIR = SHM_DIR if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK) else None
 
 
 class JavaAstParser(ast_parser.BaseAstParser):
@@ -72,57 +90,100 @@ class JavaAstParser(ast_parser.BaseAstParser):
         """Extract packages."""
         del kwargs
 
-        namespaces = (
-            {"": "http://maven.apache.org/POM/4.0.0"},
-            None,
-        )
+        # Packages with the POM namespace first, or without any namespace.
+        packages = {namespace: [] for namespace in POM_NAMESPACES}
+        for dependencies in ast:
+            tag = dependencies.tag
+            if not isinstance(tag, str) or not tag.endswith(DEPENDENCIES):
+                continue
+
+            namespace = tag[: -len(DEPENDENCIES)]
+            if namespace not in packages:
+                continue
+
+            dependency_tag = f"{namespace}{DEPENDENCY}"
+            field_tags = DEPENDENCY_FIELDS[namespace]
+            for dep in dependencies:
+                if dep.tag != dependency_tag:
+                    continue
+
+                # The first child per field, as in `find`.
+                fields = {}
+                for child in dep:
+                    field = field_tags.get(child.tag)
+                    if field is not None and field not in fields:
+                        fields[field] = child
+
+                if fields:
+                    packages[namespace].append(
+                        ast_parser.PackageData(
+                            **{
+                                field: (fields[field].text if field in fields else None)
+                                for field in field_tags.values()
+                            }
+                        )
+                    )
 
-        for namespace in namespaces:
-            packages = []
-            for dependencies in ast.findall("dependencies", namespace):
-                for dep in dependencies.findall("dependency", namespace):
-                    fields = {
-                        "artifact_id": dep.find("artifactId", namespace),
-                        "name": dep.find("groupId", namespace),
-                        "version": dep.find("version", namespace),
-                    }
-                    if not all(value is None for value in fields.values()):
-                        fields = {
-                            field: (None if value is None else value.text)
-                            for field, value in fields.items()
-                        }
-                        packages.append(ast_parser.PackageData(**fields))
-
-            if packages:
-                return tuple(packages)
+        for namespace_packages in packages.values():
+            if namespace_packages:
+                return tuple(namespace_packages)
 
         return ()
 
     def do_parse_ast(self, filename: str, *args, **kwargs) -> AstData:
         """Parse AST for a file."""
+        return self.do_parse_ast_batch((filename,), *args, **kwargs)[0]
+
+    def do_parse_ast_batch(
+        self, filenames: Sequence[str], *args, **kwargs
+    ) -> Tuple[AstData]:
+        """Parse ASTs for files with one JVM run per chunk of files."""
+        del args, kwargs
+
+        asts = []
+        for start in range(0, len(filenames), AST_BATCH_MAX_FILES):
+            asts.extend(
+                self._do_parse_ast_chunk(
+                    filenames[start : (start + AST_BATCH_MAX_FILES)]
+                )
+            )
+
+        return tuple(asts)
+
+    def _do_parse_ast_chunk(self, filenames: Sequence[str]) -> Tuple[AstData]:
         # Work dir is `.../src`.
         work_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../..")
         work_dir = os.path.abspath(work_dir)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            export_path = os.path.join(temp_dir, f"{os.path.basename(filename)}.xml")
+        asts = [None] * len(filenames)
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR) as temp_dir:
+            # Listed in a file, not in the command: No arg length limit, commas are fine.
+            input_list = os.path.join(temp_dir, "input_files.txt")
+            utils.export_file(
+                input_list, "".join(f"{name}\n" for name in filenames), log=False
+            )
+
+            # The i-th file is exported to `{i}.xml`, to be robust to duplicate basenames.
             binary_path = os.path.join(work_dir, JAVA_AST_BINARY)
             command = "; ".join(
                 [
                     # f"cd {os.path.join(work_dir, 'lang/java/native')}",
                     # f"{self.mvn} clean install",
-                    f"java -jar {binary_path} -input_files {filename} -export_path {export_path} "
-                    f"-add_line true -add_var true",
+                    f"java -jar {binary_path} -input_list {input_list} "
+                    f"-export_path {temp_dir} -add_line true -add_var true",
                 ]
             )
             _, success = utils.run_command(command, check=False)
 
             if success:
-                try:
-                    return ET.parse(export_path).getroot()
-                except Exception as error:
-                    logging.exception(
-                        "Unable to parse (%s) AST: <<<%s>>>", filename, error
-                    )
-
-        return None
+                for index, filename in enumerate(filenames):
+                    try:
+                        asts[index] = ast_parser.parse_ast_xml(
+                            os.path.join(temp_dir, f"{index}.xml")
+                        )
+                    except Exception as error:
+                        logging.exception(
+                            "Unable to parse (%s) AST: <<<%s>>>", filename, error
+                        )
+
+        return tuple(asts)
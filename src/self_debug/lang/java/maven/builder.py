@@ -6,10 +6,12 @@ Candidate commands:
 - mvn clean test -Dtest={test} -DfailIfNoTests=false
 """
 
-from typing import Any, Optional, Sequence, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 import logging
 import os
 import re
+import string
 
 from self_debug.proto import builder_pb2
 
@@ -35,10 +37,33 @@ COMPILATION_ERROR_END = BUILD_FAILURE
 # [javac] /local/home/gargshi/sdk_agent/ironhide-workspaces/ironhide-AmberDynamoDBSupport_development-2024-11-21-22-35-35-614599/src/AmberJobDynamoDBSupport/src/com/amazon/amber/spark/job/SparkJobWithDdbPublisher.java:13: error: package com.amazonaws.services.dynamodbv2.datamodeling does not exist
 # pylint: enable=line-too-long
 
-COMPILATION_ERROR_REGEX = r"^\[ERROR\]\s*(.+\.java):\[(\d+),(\d+)\]\s*(.*)$"
+# Precompiled: Searched on every line of the build output.
+COMPILATION_ERROR_REGEX = re.compile(r"^\[ERROR\]\s*(.+\.java):\[(\d+),(\d+)\]\s*(.*)$")
 # From brazil build: build system is `happytrails`
-COMPILATION_ERROR_REGEX_NO_COLUMN = r"^(.+\.java):(\d+):\s+error:(.*)$"
+COMPILATION_ERROR_REGEX_NO_COLUMN = re.compile(r"^(.+\.java):(\d+):\s+error:(.*)$")
 # COMPILATION_ERROR_REGEX_01 = r"^\[ERROR\]\s*(.*)$"
+# In every line matching either regex: Rules out other lines cheaper than the regexes.
+COMPILATION_ERROR_NEEDLE = ".java:"
+
+# Read source files for snippets concurrently, if there are at least this many.
+PARALLEL_READ_MIN_FILES = 8
+
+# Variables around the compilation error column.
+VAR_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+# Anchored at the start: Used with `match`.
+VAR_AT_START_REGEX = re.compile(r"([a-zA-Z0-9_]+)")
+VAR_METHOD_CALL_REGEX = re.compile(r"\s*([a-zA-Z0-9_]+)\s*\.[a-zA-Z0-9_]+\s*\(")
+
+
+def _var_at_end(text: str) -> str:
+    """Get the var at the end of text, ignoring trailing spaces."""
+    # Scanned backwards: An unanchored `[a-zA-Z0-9_]+\s*$` search retries at every
+    # position, quadratic in long runs of var chars not at the end.
+    text = text.rstrip()
+    start = len(text)
+    while start and text[start - 1] in VAR_CHARS:
+        start -= 1
+    return text[start:]
 
 
 class MavenBuilder(builder.BaseBuilder):
@@ -132,22 +157,35 @@ class MavenBuilder(builder.BaseBuilder):
         return super().run_final_eval()
 
     def _extract_line_build_error(
-        self, line: str, regex=None
+        self, line: str, regex: Optional[re.Pattern] = None
     ) -> Optional[builder.BuildData]:
         """Extract build error from line."""
         if regex is None:
             regex = COMPILATION_ERROR_REGEX
 
-        match = re.search(regex, line)
+        match = regex.search(line)
         if not match:
             # logging.debug("NO MATCH: <<<%s>>>", line)
             return None
 
+        return self._extract_match_build_error(match, regex)
+
+    def _extract_match_build_error(
+        self,
+        match: re.Match,
+        regex: re.Pattern,
+        tail_lines: Sequence[str] = (),
+        sources: Optional[Dict[str, Optional[Tuple[str]]]] = None,
+    ) -> builder.BuildData:
+        """Extract build error from a line matching `regex`.
+
+        Continuation lines are appended to the message, and snippets are from `sources` if given.
+        """
         filename = match.group(1)
         line_number = int(match.group(2))
 
         next_index = 3
-        if regex == COMPILATION_ERROR_REGEX:
+        if regex is COMPILATION_ERROR_REGEX:
             column_number = int(match.group(next_index))
             next_index += 1
         else:
@@ -156,18 +194,22 @@ class MavenBuilder(builder.BaseBuilder):
             "filename": filename,
             "line_number": line_number,
             "column_number": column_number,
-            "error_message": match.group(next_index).rstrip(),
+            "error_message": "\n".join(
+                [match.group(next_index).rstrip()] + list(tail_lines)
+            ),
         }
-        # Attach code snippet.
+        # Attach code snippet: Only for files in `root_dir`, skip file reads for others.
+        in_root_dir = filename.startswith(self.root_dir)
         # pylint: disable=bad-indentation
         try:
-            if column_number is not None:
+            if column_number is not None and in_root_dir:
                 code_snippet, line_copy = utils.get_snippet(
                     filename,
                     line_number,
                     min(5, line_number),
                     5,
                     lambda x: f"{x}  //  Compilation error is at this line.",
+                    lines=None if sources is None else sources.get(filename),
                 )
                 kwargs.update(
                     {
@@ -187,21 +229,18 @@ class MavenBuilder(builder.BaseBuilder):
                 var = ()
                 if char == ".":
                     # Function call: A.B(...) => (A, ).
-                    match = re.search(r"([a-zA-Z0-9_]+)\s*$", lhs)
-                    if match:
-                        var = (match.group(1),)
-                elif re.search(r"^[a-zA-Z0-9_]$", char):
+                    name = _var_at_end(lhs)
+                    if name:
+                        var = (name,)
+                elif char in VAR_CHARS:
                     # Variable.
                     # 1: The one generating the error.
-                    match = re.search(r"^([a-zA-Z0-9_]+)", rhs)
+                    match = VAR_AT_START_REGEX.match(rhs)
                     if match:
                         var = (f"{char}{match.group(1)}",)
 
                     # 0: The main var at line start: [Type var = ] A.B(...).
-                    match = re.search(
-                        r"^\s*([a-zA-Z0-9_]+)\s*\.[a-zA-Z0-9_]+\s*\(",
-                        lhs.split(" = ")[-1],
-                    )
+                    match = VAR_METHOD_CALL_REGEX.match(lhs.split(" = ")[-1])
                     if match:
                         var = (match.group(1), var)
                 else:
@@ -220,7 +259,7 @@ class MavenBuilder(builder.BaseBuilder):
         # pylint: enable=bad-indentation
 
         build_data = builder.BuildData(**kwargs)
-        if not build_data.filename.startswith(self.root_dir):
+        if not in_root_dir:
             logging.warning(
                 "File is not in root_dir (%s): <<<%s>>>.", self.root_dir, build_data
             )
@@ -228,28 +267,67 @@ class MavenBuilder(builder.BaseBuilder):
         return build_data
 
     def _extract_compilation_errors(
-        self, lines: Sequence[str], regex=None
+        self, lines: Sequence[str], regex: Optional[re.Pattern] = None
     ) -> Tuple[builder.BuildData]:
         """Extract compilation errors: By line."""
-        errors = []
+        if regex is None:
+            regex = COMPILATION_ERROR_REGEX
+        search = regex.search
 
+        # 1. Matching lines, with their continuation lines.
+        matches = []
         append_mode = False
-        while lines:
-            line = lines[0]
-            lines = lines[1:]
-
-            build_data = self._extract_line_build_error(line, regex=regex)
-            if build_data is None:
-                if errors and line.startswith(" ") and append_mode:
-                    errors[-1].error_message += f"\n{line}"
+        for line in lines:
+            match = search(line) if COMPILATION_ERROR_NEEDLE in line else None
+            if match is None:
+                if matches and line.startswith(" ") and append_mode:
+                    matches[-1][1].append(line)
                 else:
                     append_mode = False
             else:
-                errors.append(build_data)
+                matches.append((match, []))
                 append_mode = True
 
+        # 2. Source files for snippets: Each one is read and split once.
+        sources = None
+        if regex is COMPILATION_ERROR_REGEX:
+            sources = self._load_sources(
+                match.group(1)
+                for match, _ in matches
+                if match.group(1).startswith(self.root_dir)
+            )
+
+        # 3. Errors: Repeated lines (e.g. from reruns) share the same one.
+        errors, unique_errors = [], {}
+        for match, tail_lines in matches:
+            key = (match.group(0), *tail_lines)
+            build_data = unique_errors.get(key)
+            if build_data is None:
+                build_data = unique_errors[key] = self._extract_match_build_error(
+                    match, regex, tail_lines, sources
+                )
+            errors.append(build_data)
+
         return tuple(errors)
 
+    @staticmethod
+    def _load_source(filename: str) -> Optional[Tuple[str]]:
+        """Load the split lines of a source file."""
+        content = utils.load_file(filename)
+        return None if content is None else tuple(content.splitlines())
+
+    @classmethod
+    def _load_sources(cls, filenames: Iterable[str]) -> Dict[str, Optional[Tuple[str]]]:
+        """Load unique source files, concurrently if there are many."""
+        filenames: List[str] = sorted(set(filenames))
+        max_workers = utils.get_max_workers()
+        if len(filenames) < PARALLEL_READ_MIN_FILES or max_workers == 1:
+            return {filename: cls._load_source(filename) for filename in filenames}
+
+        # File reads release the GIL.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(filenames, executor.map(cls._load_source, filenames)))
+
     def _extract_non_compilation_errors(
         self, lines: Sequence[str]
     ) -> Tuple[builder.BuildData]:
@@ -263,12 +341,14 @@ class MavenBuilder(builder.BaseBuilder):
                     break
 
         if start is None:
-            for index, line in enumerate(lines[::-1]):
-                if line.startswith("[ERROR]"):
+            # The trailing `[ERROR]` lines, if any: Walk back without a reversed copy.
+            last = len(lines) - 1
+            for index in range(last, -1, -1):
+                if lines[index].startswith("[ERROR]"):
                     continue
 
-                if index > 0:
-                    start = len(lines) - index
+                if index < last:
+                    start = index + 1
 
                 break
 
@@ -301,7 +381,7 @@ class MavenBuilder(builder.BaseBuilder):
         """Extract build errors: By line."""
         del args, kwargs
 
-        lines = maven_utils.maybe_split(cmd_data.stdout)
+        stdout = cmd_data.stdout
 
         # 1. Extract lines between compilation error start and end lines.
         def _get_compilation_lines(lines: Sequence[str]) -> Sequence[str]:
@@ -315,7 +395,13 @@ class MavenBuilder(builder.BaseBuilder):
 
             return lines[start:end]
 
-        compilation_lines = _get_compilation_lines(lines)
+        # Split from the line of the first start candidate only, skipping the log before it.
+        block = stdout
+        if isinstance(stdout, str):
+            offset = stdout.find(COMPILATION_ERROR_START)
+            block = stdout[stdout.rfind("\n", 0, offset) + 1 :] if offset >= 0 else ""
+
+        compilation_lines = _get_compilation_lines(maven_utils.maybe_split(block))
         if compilation_lines:
             # Case 1: regex 00
             errors = self._extract_compilation_errors(compilation_lines)
@@ -327,7 +413,7 @@ class MavenBuilder(builder.BaseBuilder):
             errors = []
             for line in compilation_lines[1:]:
                 line = line.strip()
-                if line.strip().startswith(prefix):
+                if line.startswith(prefix):
                     errors.append(
                         builder.BuildData(
                             filename=self.project,
@@ -337,7 +423,7 @@ class MavenBuilder(builder.BaseBuilder):
                     )
             return tuple(errors)
 
-        return self._extract_non_compilation_errors(lines)
+        return self._extract_non_compilation_errors(maven_utils.maybe_split(stdout))
 
     def build(self, *args, **kwargs) -> Union[Tuple[builder.BuildData], str]:
         """Build: Return structured build data indicating success or str indicating failure."""
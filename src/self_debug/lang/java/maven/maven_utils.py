@@ -24,7 +24,10 @@ NEW_LINE = "\n"
 def maybe_split(lines: Union[str, Sequence[str]], rstrip: bool = True) -> Tuple[str]:
     """Filter maven error from its log."""
     if isinstance(lines, str):
-        lines = [(line.rstrip() if rstrip else line) for line in lines.splitlines()]
+        lines = lines.splitlines()
+        if rstrip:
+            # Stripped in C, without a Python level loop.
+            return tuple(map(str.rstrip, lines))
 
     return tuple(lines)
 
@@ -36,57 +39,50 @@ def find_first_line_match(
     if start is None:
         start = 0
 
-    for index in range(start, len(lines)):
-        if lines[index] == match:
-            return index
+    # Searched in C.
+    try:
+        return lines.index(match, start)
+    except ValueError:
+        return None
 
-    return None
 
+def _normalize_lines(
+    lines: Sequence[str],
+    remove_empty: bool,
+    max_line_len: Optional[int],
+    max_non_error_lines: Optional[int],
+) -> Tuple[str]:
+    """Normalize lines in one single pass.
 
-def _filter_maven_error(lines: Union[str, Sequence[str]]) -> Tuple[str]:
-    """Filter maven error from its log."""
-    lines = maybe_split(lines)
-
-    updated_lines = []
+    Empty or long non error lines still count towards `max_non_error_lines`.
+    """
+    error_lines, non_error_lines = [], []
+    num_non_error_lines = 0
     for line in lines:
         if line.startswith(MAVEN_ERROR_EXCLUDE_LINES_STARTS_WITH):
             continue
-        updated_lines.append(line)
-
-    return tuple(updated_lines)
-
-
-def _shorten_logs(
-    lines: Union[str, Sequence[str]], max_non_error_lines: Optional[int] = None
-) -> Tuple[str]:
-    """Shortern logs."""
-    lines = maybe_split(lines)
 
-    error_lines, non_error_lines = [], []
-    for line in lines:
         if line.startswith(MAVEN_ERROR_LINE_STARTS_WITH):
-            error_lines.append(line)
+            kept_lines = error_lines
         else:
-            non_error_lines.append(line)
+            num_non_error_lines += 1
+            if (
+                max_non_error_lines is not None
+                and num_non_error_lines > max_non_error_lines
+            ):
+                continue
+            kept_lines = non_error_lines
+
+        if remove_empty and not line.strip():
+            continue
+        if max_line_len and len(line) > max_line_len:
+            continue
 
-    if max_non_error_lines is not None:
-        non_error_lines = non_error_lines[:max_non_error_lines]
+        kept_lines.append(line)
 
     return tuple(error_lines + non_error_lines)
 
 
-def _remove_empty_lines(lines: Sequence[str]) -> Tuple[str]:
-    return tuple(s for s in lines if s.strip())
-
-
-def _remove_long_lines(lines: Sequence[str], max_line_len: int) -> Tuple[str]:
-    """Remove long lines based on the threshold."""
-    if not max_line_len:
-        return lines
-
-    return tuple(line for line in lines if len(line) <= max_line_len)
-
-
 def normalize_maven_output(
     std_out: str,
     std_err: str = "",
@@ -107,14 +103,7 @@ def normalize_maven_output(
         lines = maybe_split(text)
         message = f"Normalize maven output: lines = {len(lines)}"
 
-        lines = _filter_maven_error(lines)
-        message = f"{message} => {len(lines)} "
-        lines = _shorten_logs(lines, max_non_error_lines)
-        message = f"{message} => {len(lines)} "
-        if remove_empty:
-            lines = _remove_empty_lines(lines)
-            message = f"{message} => {len(lines)} "
-        lines = _remove_long_lines(lines, max_line_len)
+        lines = _normalize_lines(lines, remove_empty, max_line_len, max_non_error_lines)
 
         message = f"{message} => {len(lines)}."
         logging.debug(message)
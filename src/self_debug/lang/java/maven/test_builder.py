@@ -2,6 +2,7 @@
 
 import logging
 import os
+import tempfile
 import unittest
 
 from parameterized import parameterized
@@ -13,6 +14,8 @@ from self_debug.lang.base import builder_factory
 from self_debug.lang.java.maven import builder
 
 
+_PWD = os.path.dirname(os.path.abspath(__file__))
+
 _POM = "/Users/sliuxl/xmpp-light/pom.xml"
 
 TEXT_PROTO_00 = """
@@ -47,6 +50,17 @@ TEXT_PROTO_02 = """
 class TestMavenBuilder(unittest.TestCase):
     """Unit tests for builder.py."""
 
+    _mvn_builder = None
+
+    @classmethod
+    def _get_mvn_builder(cls):
+        """Builder shared by extraction tests: Its ctor runs a maven sanity check."""
+        if cls._mvn_builder is None:
+            cls._mvn_builder = builder.MavenBuilder(
+                "<JDK_PATH>", "/Users/sliuxl/xmpp-light/", require_maven_installed=False
+            )
+        return cls._mvn_builder
+
     @parameterized.expand(
         (
             (
@@ -289,13 +303,9 @@ class TestMavenBuilder(unittest.TestCase):
     )
     def test_extract_build_errors(self, filename, expected_errors):
         """Unit tests for extract_build_errors."""
-        pwd = os.path.dirname(os.path.abspath(__file__))
-        content = utils.load_file(os.path.join(pwd, filename))
+        content = utils.load_file(os.path.join(_PWD, filename))
 
-        mvn_builder = builder.MavenBuilder(
-            "<JDK_PATH>", "/Users/sliuxl/xmpp-light/", require_maven_installed=False
-        )
-        errors = mvn_builder.extract_build_errors(
+        errors = self._get_mvn_builder().extract_build_errors(
             base_builder.CmdData(stdout=content, return_code=0)
         )
 
@@ -338,6 +348,71 @@ class TestMavenBuilder(unittest.TestCase):
             return
         self.assertEqual(errors, expected_errors)
 
+    @parameterized.expand(
+        (
+            (True,),
+            (False,),
+        )
+    )
+    def test_extract_line_build_error_root_dir(self, in_root_dir):
+        """Unit tests for _extract_line_build_error: Snippets for files in root_dir only."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, "A.java")
+            utils.export_file(filename, "class A {\n  int a = b.c();\n}\n")
+
+            mvn_builder = builder.MavenBuilder(
+                "<JDK_PATH>",
+                temp_dir if in_root_dir else "/other/root_dir",
+                require_maven_installed=False,
+            )
+            error = mvn_builder._extract_line_build_error(
+                f"[ERROR] {filename}:[2,12] cannot find symbol"
+            )
+
+        self.assertEqual(error.line_number, 2)
+        self.assertEqual(error.column_number, 12)
+        self.assertEqual(error.error_message, "cannot find symbol")
+        if in_root_dir:
+            self.assertIn("int a = b.c();", error.code_snippet)
+            self.assertEqual(error.variables, (("b",), ("  int a = b", ".", "c();")))
+        else:
+            self.assertIsNone(error.code_snippet)
+            self.assertEqual(error.variables, ())
+
+    def test_extract_compilation_errors_repeated_lines(self):
+        """Unit tests for _extract_compilation_errors: Repeated lines share errors."""
+        mvn_builder = builder.MavenBuilder(
+            "<JDK_PATH>", "/other/root_dir", require_maven_installed=False
+        )
+        lines = (
+            "[ERROR] /root_dir/A.java:[2,12] cannot find symbol",
+            "  symbol: b",
+            "[ERROR] /root_dir/A.java:[3,12] cannot find symbol",
+            "[ERROR] /root_dir/A.java:[2,12] cannot find symbol",
+            "  symbol: b",
+            "[ERROR] /root_dir/A.java:[2,12] cannot find symbol",
+        )
+
+        errors = mvn_builder._extract_compilation_errors(lines)
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(errors[0].error_message, "cannot find symbol\n  symbol: b")
+        self.assertIs(errors[2], errors[0])
+        self.assertEqual(errors[3].error_message, "cannot find symbol")
+        self.assertEqual(errors[1].line_number, 3)
+
+    @parameterized.expand(
+        (
+            ("  int a = b", "b"),
+            ("  a.b().c  ", "c"),
+            ("  foo(", ""),
+            ("", ""),
+            ("x" * 2000 + " +", ""),
+        )
+    )
+    def test_var_at_end(self, text, expected_var):
+        """Unit tests for _var_at_end."""
+        self.assertEqual(builder._var_at_end(text), expected_var)
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG, format=utils.LOGGING_FORMAT)
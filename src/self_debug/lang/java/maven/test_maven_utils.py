@@ -11,6 +11,8 @@ from self_debug.common import utils
 from self_debug.lang.java.maven import maven_utils
 
 
+_PWD = os.path.dirname(os.path.abspath(__file__))
+
 NEW_LINE = maven_utils.NEW_LINE
 
 
@@ -166,9 +168,8 @@ class TestMavenUtils(unittest.TestCase):
 
         def _maybe_load(filename):
             if isinstance(filename, str):
-                pwd = os.path.dirname(os.path.abspath(__file__))
                 return maven_utils.maybe_split(
-                    utils.load_file(os.path.join(pwd, filename))
+                    utils.load_file(os.path.join(_PWD, filename))
                 )
             return filename
 
@@ -181,6 +182,26 @@ class TestMavenUtils(unittest.TestCase):
             NEW_LINE.join(_maybe_load(expected_text)),
         )
 
+    @parameterized.expand(
+        (
+            (
+                {"max_non_error_lines": 1},
+                EXPECTED_TEXTS_MAX_100[:-1],
+            ),
+            # Empty lines count towards the max.
+            (
+                {"max_non_error_lines": 3, "remove_empty": False, "max_line_len": 30},
+                EXPECTED_TEXTS_MAX_30 + ("",),
+            ),
+        )
+    )
+    def test_normalize_maven_output_max_non_error_lines(self, kwargs, expected_text):
+        """Unit tests for normalize_maven_output with max non error lines."""
+        self.assertEqual(
+            maven_utils.normalize_maven_output(NEW_LINE.join(TEXTS), **kwargs),
+            NEW_LINE.join(expected_text),
+        )
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format=utils.LOGGING_FORMAT)
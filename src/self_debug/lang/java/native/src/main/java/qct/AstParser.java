@@ -2,13 +2,17 @@
 The binary to get the abstract syntax tree given a .java file.
 
 Input:
-  -input_files (str):       Full path to the .java file(s), supporting one single file now.
+  -input_files (str):       Full path to the .java file(s), comma separated.
+  -input_list (str):        Full path to a file listing the .java files, one per line: Overrides
+                            `-input_files`, for paths with commas or too many files for one arg.
   -add_import (bool = false): Whether to parse imports.
   -add_line (bool = false): Whether to parse line numbers.
   -add_var (bool = false):  Whether to parse variables.
 
 Output:
-  -export_path (str):       Full path to the output xml file.
+  -export_path (str):       Full path to the output xml file for one single input file, or to the
+                            output dir for multiple ones or `-input_list`: The i-th file is
+                            written to `{i}.xml`.
 */
 
 package qct.ast_parser;
@@ -29,6 +33,9 @@ import java.io.File;
 import java.io.FileNotFoundException;
 import java.io.IOException;
 import java.io.PrintWriter;
+import java.nio.file.Files;
+import java.nio.file.Paths;
+import java.util.Arrays;
 import java.util.HashMap;
 import java.util.List;
 import java.util.stream.Collectors;
@@ -51,7 +58,7 @@ import qct.ast_parser.XmlBeautifier;
 
 public class AstParser {
 
-    public static void main(String[] args) throws FileNotFoundException {
+    public static void main(String[] args) throws IOException {
         // Parse command-line arguments into a dictionary.
         HashMap<String, String> argMap = new HashMap<>();
         for (int i = 0; i < args.length; i++) {
@@ -68,12 +75,38 @@ public class AstParser {
         }
 
         String export_path = argMap.get("export_path");
+        if (argMap.containsKey("input_list")) {
+            List<String> input_files = Files.readAllLines(Paths.get(argMap.get("input_list")))
+                .stream()
+                .filter(line -> !line.isEmpty())
+                .collect(Collectors.toList());
+            parseFiles(input_files, export_path, argMap);
+            return;
+        }
+
+        String[] input_files = argMap.getOrDefault("input_files", "").split(",");
+        if (input_files.length == 1) {
+            parseFile(input_files[0], export_path, argMap);
+            return;
+        }
+
+        parseFiles(Arrays.asList(input_files), export_path, argMap);
+    }
+
+    // One JVM for all files: The i-th file is written to `{export_dir}/{i}.xml`.
+    private static void parseFiles(List<String> input_files, String export_dir, HashMap<String, String> argMap) {
+        new File(export_dir).mkdirs();
+        for (int i = 0; i < input_files.size(); i++) {
+            parseFile(input_files.get(i), new File(export_dir, i + ".xml").getPath(), argMap);
+        }
+    }
+
+    private static void parseFile(String input_file, String export_path, HashMap<String, String> argMap) {
         try {
-            String input_files = argMap.get("input_files");
-            System.out.printf("[QCT] Reading from `%s`.%n", input_files);
+            System.out.printf("[QCT] Reading from `%s`.%n", input_file);
 
             // Parse the Java source file
-            CompilationUnit cu = StaticJavaParser.parse(new File(input_files));
+            CompilationUnit cu = StaticJavaParser.parse(new File(input_file));
 
             // Create a DOM document to represent the XML structure
             DocumentBuilderFactory dbFactory = DocumentBuilderFactory.newInstance();
@@ -115,9 +148,10 @@ public class AstParser {
             Document document = builder.parse(new File(export_path));
             // Document document = builder.parse(new ByteArrayInputStream(xmlBuilder.toString().getBytes()));
 
-            // Write XML to file.
-            PrintWriter out = new PrintWriter(export_path);
-            XmlBeautifier.writeXmlToFile(document, export_path);
+            // Write XML to file: Closed right away, as one JVM may parse many files.
+            try (PrintWriter out = new PrintWriter(export_path)) {
+                XmlBeautifier.writeXmlToFile(document, export_path);
+            }
         } catch (ParserConfigurationException | SAXException | IOException | TransformerException e) {
             e.printStackTrace();
         }
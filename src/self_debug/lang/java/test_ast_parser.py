@@ -3,16 +3,21 @@
 from collections import defaultdict
 import logging
 import os
+import tempfile
 import unittest
+import xml.etree.ElementTree as ET
 
 from parameterized import parameterized
 from self_debug.proto import ast_parser_pb2
 
 from self_debug.common import utils
+from self_debug.lang.base import ast_parser as base_ast_parser
 from self_debug.lang.base import ast_parser_factory
 from self_debug.lang.java import ast_parser
 
 
+_PWD = os.path.dirname(os.path.abspath(__file__))
+
 ClassData = ast_parser.ClassData
 LineData = ast_parser.LineData
 MethodData = ast_parser.MethodData
@@ -193,7 +198,7 @@ class TestJavaAstParser(unittest.TestCase):
     )
     def test_parse_packages(self, filename, expected_packages):
         """Unit tests for parse_packages."""
-        project = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+        project = os.path.join(_PWD, filename)
         java_ast_parser = ast_parser.JavaAstParser(
             os.path.dirname(project), project=project
         )
@@ -203,6 +208,27 @@ class TestJavaAstParser(unittest.TestCase):
             logging.debug(pkg)
         self.assertEqual(packages, expected_packages)
 
+    def test_parse_packages_from_project_ast(self):
+        """Unit tests for parse_packages_from_project_ast: No namespace."""
+        ast = ET.fromstring(
+            "<project><dependencyManagement><dependencies><dependency>"
+            "<groupId>managed</groupId></dependency></dependencies></dependencyManagement>"
+            "<dependencies>"
+            "<dependency><groupId>g0</groupId><groupId>g1</groupId><version/></dependency>"
+            "<dependency><scope>test</scope></dependency>"
+            "<dependency><artifactId>a2</artifactId><version>1.0</version></dependency>"
+            "</dependencies></project>"
+        )
+        java_ast_parser = ast_parser.JavaAstParser("project")
+
+        self.assertEqual(
+            java_ast_parser.parse_packages_from_project_ast(ast),
+            (
+                PackageData(name="g0", version=None, artifact_id=None),
+                PackageData(name=None, version="1.0", artifact_id="a2"),
+            ),
+        )
+
     @parameterized.expand(
         (
             # pylint: disable=line-too-long
@@ -387,7 +413,7 @@ class TestJavaAstParser(unittest.TestCase):
     )
     def test_run_metrics(self, filename, expected_metrics):
         """Unit tests for run_metrics."""
-        project = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+        project = os.path.join(_PWD, filename)
         java_ast_parser = ast_parser.JavaAstParser(
             os.path.dirname(project), project=project
         )
@@ -396,6 +422,14 @@ class TestJavaAstParser(unittest.TestCase):
         for name, value in sorted(metrics.items()):
             logging.debug("%s: %d", name, value)
         self.assertEqual(metrics, expected_metrics)
+        # Each access gets its own copy: Missing keys read by callers don't leak.
+        self.assertEqual(metrics["<missing>"], 0)
+        self.assertIsNot(java_ast_parser.metrics, metrics)
+        self.assertEqual(java_ast_parser.metrics, expected_metrics)
+
+        # Counted from scratch after a reset.
+        java_ast_parser.reset()
+        self.assertEqual(java_ast_parser.run_metrics(), expected_metrics)
 
     @parameterized.expand(
         (
@@ -647,7 +681,7 @@ class TestJavaAstParser(unittest.TestCase):
         self, filename, kwargs, expected_classes, expected_strs, expected_variables
     ):
         """Unit tests for parse_ast, parse_classes and parse_variables."""
-        filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+        filename = os.path.join(_PWD, filename)
         java_ast_parser = ast_parser.JavaAstParser("project")
 
         logging.info("Classes:")
@@ -666,6 +700,272 @@ class TestJavaAstParser(unittest.TestCase):
             logging.info(var)
         self.assertEqual(variables, expected_variables)
 
+    def test_data_eq(self):
+        """Unit tests for MethodData and ClassData equality."""
+        var = VariableData(name="v", signature="int", lines=LineData(line_start=3))
+        method = MethodData(name="m", signature="void m()", params=(var,))
+        cls = ClassData(name="C", signature="class C", methods=(method,))
+
+        # Lists or tuples.
+        self.assertEqual(
+            cls, ClassData(name="C", signature="class C", methods=[method])
+        )
+        self.assertEqual(
+            method, MethodData(name="m", signature="void m()", params=[var])
+        )
+        self.assertNotEqual(
+            method, MethodData(name="m", signature="void m()", local_vars=(var,))
+        )
+
+        for data in (method, cls):
+            self.assertNotEqual(data, None)
+            self.assertNotEqual(data, var)
+
+    def test_parse_ast_xml(self):
+        """Unit tests for parse_ast_xml."""
+        with tempfile.NamedTemporaryFile("w", suffix=".xml") as file:
+            file.write(
+                "<File><Class><Name>User</Name><Signature>class User</Signature>"
+                "<LineStart>12</LineStart><LineEnd>61</LineEnd></Class></File>"
+            )
+            file.flush()
+
+            ast = base_ast_parser.parse_ast_xml(file.name)
+
+        cls = ast.find("Class")
+        self.assertEqual(cls.find("LineStart").text, 12)
+        self.assertEqual(cls.find("LineEnd").text, 61)
+        self.assertEqual(cls.find("Name").text, "User")
+
+        java_ast_parser = ast_parser.JavaAstParser("project")
+        self.assertEqual(
+            java_ast_parser.parse_classes("User.java", ast=ast),
+            (
+                ClassData(
+                    name="User",
+                    signature="class User",
+                    lines=LineData(line_start=12, line_end=61),
+                ),
+            ),
+        )
+
+    def test_parse_classes_fields(self):
+        """Unit tests for parse_classes: Only the requested fields are parsed."""
+        filename = os.path.join(_PWD, "testdata/ast_parser.xml")
+        ast = base_ast_parser.parse_ast_xml(filename)
+
+        java_ast_parser = ast_parser.JavaAstParser("project")
+        classes = java_ast_parser.parse_classes("AstParser.java", ast=ast)
+        self.assertEqual(len(classes), 2)
+        self.assertTrue(any(cls.members for cls in classes))
+        self.assertTrue(any(cls.methods for cls in classes))
+        self.assertTrue(all(isinstance(cls.methods, list) for cls in classes))
+
+        classes_wo_methods = java_ast_parser.parse_classes(
+            "AstParser.java", ast=ast, methods=False
+        )
+        for cls, cls_wo_methods in zip(classes, classes_wo_methods):
+            self.assertEqual(cls_wo_methods.methods, ())
+            self.assertEqual(cls_wo_methods.members, cls.members)
+            self.assertEqual(cls_wo_methods.parents, cls.parents)
+
+    def test_lru_cache(self):
+        """Unit tests for _LruCache: The least recently used items are evicted first."""
+        cache = base_ast_parser._LruCache(max_size=2)
+        cache["a"] = 0
+        cache["b"] = 1
+        self.assertEqual(cache["a"], 0)
+
+        cache["c"] = 2
+        self.assertEqual(len(cache), 2)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache["c"], 2)
+
+    def test_parse_ast_cache(self):
+        """Unit tests for parse_ast: Cached by file mtime and size."""
+
+        class CountingAstParser(ast_parser.JavaAstParser):
+            """Count calls to do_parse_ast."""
+
+            calls = 0
+
+            def do_parse_ast(self, filename, *args, **kwargs):
+                self.calls += 1
+                return ET.Element("File")
+
+        java_ast_parser = CountingAstParser("project")
+        with tempfile.NamedTemporaryFile("w", suffix=".java") as file:
+            file.write("class A {}")
+            file.flush()
+
+            ast = java_ast_parser.parse_ast(file.name)
+            self.assertIs(java_ast_parser.parse_ast(file.name), ast)
+            self.assertEqual(java_ast_parser.calls, 1)
+
+            file.write(" class B {}")
+            file.flush()
+
+            self.assertIsNot(java_ast_parser.parse_ast(file.name), ast)
+            self.assertEqual(java_ast_parser.calls, 2)
+
+        java_ast_parser.reset()
+        java_ast_parser.parse_ast(file.name)
+        java_ast_parser.parse_ast(file.name)
+        self.assertEqual(java_ast_parser.calls, 3)
+
+    def test_parse_classes_cache(self):
+        """Unit tests for parse_classes: Cached by file mtime, size and kwargs."""
+
+        class CountingAstParser(ast_parser.JavaAstParser):
+            """Count calls to do_parse_ast."""
+
+            calls = 0
+
+            def do_parse_ast(self, filename, *args, **kwargs):
+                self.calls += 1
+                return ET.fromstring(
+                    "<File><Class><Name>A</Name><Signature>class A</Signature>"
+                    "<LineStart>1</LineStart></Class></File>"
+                )
+
+        java_ast_parser = CountingAstParser("project")
+        with tempfile.NamedTemporaryFile("w", suffix=".java") as file:
+            file.write("class A {}")
+            file.flush()
+
+            classes = java_ast_parser.parse_classes(file.name)
+            self.assertEqual(len(classes), 1)
+            # Copies of the cached classes: Changing them doesn't change the cache.
+            classes[0].methods.append(None)
+            self.assertEqual(java_ast_parser.parse_classes(file.name)[0].methods, [])
+            self.assertEqual(
+                java_ast_parser.parse_classes(file.name, methods=False)[0].methods, ()
+            )
+            # Unhashable kwargs are not cached.
+            self.assertEqual(
+                len(java_ast_parser.parse_classes(file.name, options=["a"])), 1
+            )
+            # The AST is cached too.
+            java_ast_parser.parse_ast(file.name)
+            self.assertEqual(java_ast_parser.calls, 1)
+
+            file.write(" ")
+            file.flush()
+
+            java_ast_parser.parse_classes(file.name)
+            self.assertEqual(java_ast_parser.calls, 2)
+
+    def test_parse_packages_cache(self):
+        """Unit tests for parse_packages: Cached by project file mtime and size."""
+        pom = """<project>
+  <dependencies>
+    <dependency><groupId>g</groupId><artifactId>a</artifactId>{version}</dependency>
+  </dependencies>
+</project>"""
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project = os.path.join(temp_dir, "pom.xml")
+            utils.export_file(project, pom.format(version=""))
+            java_ast_parser = ast_parser.JavaAstParser(temp_dir, project=project)
+
+            ast = java_ast_parser.parse_project_ast()
+            packages = java_ast_parser.parse_packages()
+            self.assertEqual(packages, (PackageData(name="g", artifact_id="a"),))
+            self.assertIs(java_ast_parser.parse_project_ast(), ast)
+            self.assertIs(java_ast_parser.parse_packages(), packages)
+
+            utils.export_file(project, pom.format(version="<version>1</version>"))
+            self.assertIsNot(java_ast_parser.parse_project_ast(), ast)
+            self.assertEqual(
+                java_ast_parser.parse_packages(),
+                (PackageData(name="g", artifact_id="a", version="1"),),
+            )
+
+    @parameterized.expand(
+        (
+            (1,),
+            (base_ast_parser.PARALLEL_PARSE_MIN_FILES + 2,),
+        )
+    )
+    def test_parse(self, num_files):
+        """Unit tests for parse: Serially or in parallel with the base batch parser."""
+
+        class RecordingAstParser(ast_parser.JavaAstParser):
+            """Record calls to do_parse_ast."""
+
+            do_parse_ast_batch = base_ast_parser.BaseAstParser.do_parse_ast_batch
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.filenames = []
+
+            def do_parse_ast(self, filename, *args, **kwargs):
+                self.filenames.append(filename)
+                return ET.Element(os.path.basename(filename))
+
+        java_ast_parser = RecordingAstParser("project")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filenames = []
+            for index in range(num_files):
+                filename = os.path.join(temp_dir, f"F{index}.java")
+                utils.export_file(filename, f"class F{index} {{}}")
+                filenames.append(filename)
+
+            project_ast, ast = java_ast_parser.parse(filenames)
+            self.assertIsNone(project_ast)
+            self.assertEqual(tuple(ast), tuple(filenames))
+            for filename, file_ast in ast.items():
+                self.assertEqual(file_ast.tag, os.path.basename(filename))
+            self.assertEqual(sorted(java_ast_parser.filenames), sorted(filenames))
+
+            # Cached.
+            _, new_ast = java_ast_parser.parse(filenames)
+            self.assertEqual(new_ast, ast)
+            self.assertEqual(len(java_ast_parser.filenames), num_files)
+
+    def test_do_parse_ast_batch(self):
+        """Unit tests for do_parse_ast_batch: Same as parsing one file at a time."""
+        filenames = tuple(
+            os.path.join(_PWD, filename)
+            for filename in ("testdata/User.java", "testdata/WebSecurityConfig.java")
+        )
+        java_ast_parser = ast_parser.JavaAstParser("project")
+
+        asts = java_ast_parser.do_parse_ast_batch(filenames)
+        self.assertEqual(len(asts), len(filenames))
+        for filename, ast in zip(filenames, asts):
+            self.assertEqual(
+                java_ast_parser.parse_classes(filename, ast=ast),
+                java_ast_parser.parse_classes(filename),
+            )
+
+    def test_do_parse_ast_batch_chunks(self):
+        """Unit tests for do_parse_ast_batch: One JVM run per bounded chunk, in order."""
+
+        class ChunkingAstParser(ast_parser.JavaAstParser):
+            """Record chunks instead of running the JVM."""
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.chunks = []
+
+            def _do_parse_ast_chunk(self, filenames):
+                self.chunks.append(filenames)
+                return tuple(ET.Element(filename) for filename in filenames)
+
+        filenames = tuple(
+            f"/a,b/{index}.java" for index in range(ast_parser.AST_BATCH_MAX_FILES + 1)
+        )
+        java_ast_parser = ChunkingAstParser("project")
+
+        asts = java_ast_parser.do_parse_ast_batch(filenames)
+        self.assertEqual(tuple(ast.tag for ast in asts), filenames)
+        self.assertEqual(
+            [len(chunk) for chunk in java_ast_parser.chunks],
+            [ast_parser.AST_BATCH_MAX_FILES, 1],
+        )
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format=utils.LOGGING_FORMAT)
@@ -4,8 +4,6 @@ from collections import defaultdict
 import logging
 from typing import Any, Dict, Tuple
 
-import numpy
-
 
 METRICS_FORMAT = "format"
 METRICS_SEP = "--"
@@ -39,6 +37,9 @@ def reduce_by_key(lhs: Dict[str, int], rhs: Dict[str, int], reduce_fn: Any = Non
     if reduce_fn is None:
         reduce_fn = sum
 
+    # Imported lazily: It's slow to import, and only used here.
+    import numpy  # pylint: disable=import-outside-toplevel
+
     keys = set(lhs.keys()) | set(rhs.keys())
     for key in keys:
         if reduce_fn in (min, numpy.mean, numpy.median) and (